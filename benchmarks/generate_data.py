@@ -0,0 +1,125 @@
+#  Seeded synthetic data for the benchmarks (run_benchmarks.py) and for trying the tasks
+#  at scale.
+#    leads: email, date, source, name, phone, like task_1/company_leads.csv, with a share
+#           of dirty rows (bad emails, phones without country code, unreadable dates) and
+#           of duplicates (same mailbox written differently)
+#    sales: customer, amount, date, like task_3/sales_data.csv
+#  Files are written 1M rows at a time, so 10M rows need no more memory than 1M.
+#  Usage: python generate_data.py --rows 10k 1m [--out data] [--dirty 0.05] [--duplicates 0.05]
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 1_000_000
+SYLLABLES = ['ka', 'ro', 'mi', 'an', 'ty', 'le', 'son', 'ber', 'vi', 'dor', 'sh', 'el', 'ma', 'ri', 'ton', 'ge']
+DOMAINS = ['gmail.com', 'yahoo.com', 'outlook.com', 'acme.com', 'example.org', 'mail.in']
+SOURCES = ['LinkedIn', 'Website', 'Referral', 'Event', 'Cold Call']
+START_DATE = pd.Timestamp('2024-01-01')
+DAYS = 730
+
+# '10k' -> 10000, '1m' -> 1000000, '2500' -> 2500
+def parse_rows(text):
+    text = str(text).strip().lower().replace('_', '')
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * scale)
+
+def _words(rng, count, parts):
+    syl = np.array(SYLLABLES)
+    out = syl[rng.integers(0, len(syl), count)]
+    for _ in range(parts - 1):
+        out = np.char.add(out, syl[rng.integers(0, len(syl), count)])
+    return out
+
+def _dates(rng, count):
+    return (START_DATE + pd.to_timedelta(rng.integers(0, DAYS, count), unit='D')).strftime('%Y-%m-%d')
+
+# one chunk of leads; `start` keeps mailboxes unique across chunks
+def make_leads(rows, dirty=0.05, duplicates=0.05, seed=42, start=0):
+    rng = np.random.default_rng(seed)
+    unique = rows - int(rows * duplicates)
+    first, last = _words(rng, unique, 2), _words(rng, unique, 3)
+    ids = np.arange(start, start + unique).astype(str)
+    local = np.char.add(np.char.add(np.char.add(first, '.'), last), ids)
+    df = pd.DataFrame({
+        'email': np.char.add(np.char.add(local, '@'), np.array(DOMAINS)[rng.integers(0, len(DOMAINS), unique)]),
+        'date': _dates(rng, unique),
+        'source': np.array(SOURCES)[rng.integers(0, len(SOURCES), unique)],
+        'name': np.char.add(np.char.add(np.char.capitalize(first), ' '), np.char.capitalize(last)),
+        'phone': np.char.add('+91', rng.integers(7_000_000_000, 9_999_999_999, unique).astype(str)),
+    })
+
+    # duplicates: the same mailbox in upper case with spaces, with a +tag, or repeated as is
+    dups = df.iloc[rng.integers(0, unique, rows - unique)].copy()
+    kind = rng.integers(0, 3, len(dups))
+    user_domain = dups['email'].str.split('@', n=1, expand=True)
+    dups['email'] = np.select([kind == 0, kind == 1],
+                              [' ' + dups['email'].str.upper() + ' ', user_domain[0] + '+promo@' + user_domain[1]],
+                              dups['email'])
+    df = pd.concat([df, dups], ignore_index=True)
+
+    # dirty rows: broken email, local phone without country code, or an unreadable date
+    bad = rng.random(rows) < dirty
+    kind = rng.integers(0, 3, rows)
+    df.loc[bad & (kind == 0), 'email'] = df['email'].str.split('@').str[0] + '@'
+    df.loc[bad & (kind == 1), 'phone'] = df['phone'].str[3:]
+    df.loc[bad & (kind == 2), 'date'] = 'not a date'
+    return df.iloc[rng.permutation(rows)].reset_index(drop=True)
+
+# one chunk of sales; about one customer per 20 sales (at most 200,000), a few buying a lot
+def make_sales(rows, seed=7, customers=None):
+    rng = np.random.default_rng(seed)
+    customers = customers or max(10, min(200_000, rows // 20))
+    customer = (rng.zipf(1.2, rows) - 1) % customers
+    return pd.DataFrame({
+        'customer': np.char.add('Customer ', customer.astype(str)),
+        'amount': rng.uniform(100, 50_000, rows).round(2),
+        'date': _dates(rng, rows),
+    })
+
+# writes `rows` rows made by make(chunk_rows, seed, start) to path, CHUNK_ROWS at a time
+def _write_chunks(path, rows, make):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    for start in range(0, rows, CHUNK_ROWS):
+        chunk = make(min(CHUNK_ROWS, rows - start), start // CHUNK_ROWS, start)
+        chunk.to_csv(tmp, mode='a' if start else 'w', header=not start, index=False)
+    os.replace(tmp, path)
+    return path
+
+def leads_path(out, rows, dirty=0.05, duplicates=0.05, seed=42):
+    return os.path.join(out, f"leads_{rows}_d{dirty:g}_u{duplicates:g}_s{seed}.csv")
+
+def sales_path(out, rows, seed=7):
+    return os.path.join(out, f"sales_{rows}_s{seed}.csv")
+
+# returns the path of the leads file, generating it only when it doesn't exist yet
+def write_leads(out, rows, dirty=0.05, duplicates=0.05, seed=42):
+    path = leads_path(out, rows, dirty, duplicates, seed)
+    if os.path.exists(path):
+        return path
+    return _write_chunks(path, rows, lambda n, i, start: make_leads(n, dirty, duplicates, seed + i, start))
+
+def write_sales(out, rows, seed=7):
+    path = sales_path(out, rows, seed)
+    if os.path.exists(path):
+        return path
+    customers = max(10, min(200_000, rows // 20))
+    return _write_chunks(path, rows, lambda n, i, start: make_sales(n, seed + i, customers))
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic leads and sales data")
+    parser.add_argument('--rows', nargs='+', default=['10k'], help="sizes such as 10k 1m 10m")
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+    parser.add_argument('--dirty', type=float, default=0.05, help="share of leads with a bad email/phone/date")
+    parser.add_argument('--duplicates', type=float, default=0.05, help="share of leads repeating another mailbox")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    for rows in map(parse_rows, args.rows):
+        print(f"📄 {write_leads(args.out, rows, args.dirty, args.duplicates, args.seed)}")
+        print(f"📄 {write_sales(args.out, rows, args.seed)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#  End-to-end benchmarks for the four tasks on generated data (generate_data.py).
+#    clean_leads      task_1 clean_leads() on the raw leads
+#    generate_report  task_1 lead report (Excel) on the cleaned leads
+#    analyze_sales    task_3 analyze_sales() on the sales CSV
+#    sqlite_import    task_4 lead import into a new SQLite database
+#    report_export    task_4 generate_report(): charts, Excel and PDF for all sales
+#    bulk_mail        task_2 send_bulk_emails() to a local SMTP sink (needs aiosmtpd)
+#  Every case runs in a fresh process (set-up in a separate one), so imports, caches and
+#  peak RSS belong to that case alone. CSV and report caches are cleared first, so the
+#  times are cold runs. Results go to a JSON file; --compare prints the change against
+#  an earlier results file.
+#  Usage: python run_benchmarks.py [--rows 10k 1m] [--cases clean_leads analyze_sales]
+#                                  [--output results.json] [--compare results/old.json]
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from generate_data import parse_rows, write_leads, write_sales
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+CASES = {  # case -> task folder whose modules it imports
+    'clean_leads': 'task_1',
+    'generate_report': 'task_1',
+    'analyze_sales': 'task_3',
+    'sqlite_import': 'task_4',
+    'report_export': 'task_4',
+    'bulk_mail': 'task_2',
+}
+CSV_CACHE_DIR = '.csv_cache'        # task_1 / task_3 columnar_cache.py
+REPORT_CACHE_DIR = '.report_cache'  # task_3 / task_4 artifact cache
+
+# ---- cases (run inside the child process, cwd = the case's work folder) ----
+def _clear_csv_cache(csv_file):
+    shutil.rmtree(os.path.join(os.path.dirname(os.path.abspath(csv_file)), CSV_CACHE_DIR), ignore_errors=True)
+
+# task_1 output shared by the cases that start from cleaned leads
+def _cleaned_leads(ctx):
+    path = os.path.join(ctx['workdir'], 'clean_customers.csv')
+    if not os.path.exists(path):
+        from clean_leads import clean_leads
+        clean_leads(ctx['leads'], path, country_code='91')
+    return path
+
+def case_clean_leads(ctx, phase):
+    if phase == 'prepare':
+        _clear_csv_cache(ctx['leads'])
+        return
+    from clean_leads import clean_leads
+    clean_leads(ctx['leads'], os.path.join(ctx['workdir'], 'clean_customers.csv'), country_code='91')
+    return ctx['rows']
+
+def case_generate_report(ctx, phase):
+    if phase == 'prepare':
+        _clear_csv_cache(_cleaned_leads(ctx))
+        return
+    from generate_report import generate_report
+    generate_report(_cleaned_leads(ctx), 'leads_reports.xlsx')
+    return ctx['rows']
+
+def case_analyze_sales(ctx, phase):
+    if phase == 'prepare':
+        _clear_csv_cache(ctx['sales'])
+        return
+    from sales_analyzer import analyze_sales
+    analyze_sales(ctx['sales'])
+    return ctx['rows']
+
+def _reset_database():
+    for suffix in ('', '-wal', '-shm'):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove('crm_lite.db' + suffix)
+
+def case_sqlite_import(ctx, phase):
+    if phase == 'prepare':
+        _reset_database()
+        return
+    import crm_lite_integrated as crm
+    crm.init_database()
+    crm.import_leads_file(ctx['leads'], country_code='91', show_progress=False)
+    crm.repo.close()
+    return ctx['rows']
+
+def case_report_export(ctx, phase):
+    import crm_lite_integrated as crm
+    if phase == 'prepare':
+        import pandas as pd
+        _reset_database()
+        shutil.rmtree(REPORT_CACHE_DIR, ignore_errors=True)
+        crm.init_database()
+        with crm.repo.conn as conn:
+            for chunk in pd.read_csv(ctx['sales'], chunksize=200_000):
+                conn.executemany('INSERT INTO sales (lead_id, customer_name, amount, date) VALUES (NULL, ?, ?, ?)',
+                                 chunk[['customer', 'amount', 'date']].itertuples(index=False, name=None))
+        crm.repo.close()
+        return
+    crm.generate_report()
+    if crm._report_pool is not None:
+        crm._report_pool.shutdown()  # so the workers' peak RSS is counted (RUSAGE_CHILDREN)
+    return ctx['rows']
+
+def case_bulk_mail(ctx, phase):
+    recipients = os.path.join(ctx['workdir'], 'recipients.csv')
+    if phase == 'prepare':
+        import pandas as pd
+        pd.read_csv(_cleaned_leads(ctx), nrows=ctx['mail_limit']).to_csv(recipients, index=False)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove('email_log.txt')
+        return
+    from aiosmtpd.controller import Controller
+    from mailer import send_bulk_emails
+
+    class Sink:
+        async def handle_DATA(self, server, session, envelope):
+            return '250 OK'
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    controller = Controller(Sink(), hostname='127.0.0.1', port=port)
+    controller.start()
+    try:
+        stats = send_bulk_emails(os.path.join(ROOT, 'task_2', 'welcome.txt'), recipients, 'email_log.txt',
+                                 smtp_server='127.0.0.1', smtp_port=port, sender_email='bench@localhost',
+                                 sender_password=None, use_tls=False, rate=None)
+    finally:
+        controller.stop()
+    return stats['sent']
+
+# Peak resident memory in MB of this process and its finished children (None on Windows).
+# On Linux ru_maxrss survives exec, so a child would report the runner's peak when that
+# was higher; VmHWM belongs to the current process image only.
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if sys.platform == 'darwin':  # bytes on macOS, KB elsewhere
+        return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, children) / 2**20
+    try:
+        with open('/proc/self/status') as f:
+            own = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+    except (OSError, StopIteration):
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max(own, children) / 2**10
+
+def run_child(ctx):
+    sys.path.insert(0, os.path.join(ROOT, CASES[ctx['case']]))
+    os.chdir(ctx['workdir'])
+    case = globals()[f"case_{ctx['case']}"]
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        rows = case(ctx, ctx['phase'])
+        seconds = time.perf_counter() - start
+    if ctx['phase'] == 'run':
+        with open(ctx['result'], 'w') as f:
+            json.dump({'rows': rows, 'seconds': seconds, 'peak_rss_mb': _peak_rss_mb()}, f)
+
+# ---- parent ----
+def _run_phase(ctx, phase):
+    ctx = {**ctx, 'phase': phase}
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', json.dumps(ctx)],
+                          capture_output=True, text=True)
+    if proc.returncode:
+        lines = proc.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"exit status {proc.returncode}")
+
+def run_case(ctx):
+    os.makedirs(ctx['workdir'], exist_ok=True)
+    record = {'case': ctx['case'], 'task': CASES[ctx['case']], 'rows': ctx['rows']}
+    try:
+        _run_phase(ctx, 'prepare')
+        _run_phase(ctx, 'run')
+        with open(ctx['result']) as f:
+            measured = json.load(f)
+    except RuntimeError as e:
+        return {**record, 'seconds': None, 'rows_per_s': None, 'peak_rss_mb': None, 'error': str(e)}
+    return {**record, 'rows': measured['rows'], 'seconds': round(measured['seconds'], 3),
+            'rows_per_s': round(measured['rows'] / measured['seconds']) if measured['seconds'] else None,
+            'peak_rss_mb': None if measured['peak_rss_mb'] is None else round(measured['peak_rss_mb'], 1),
+            'error': None}
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_result(r):
+    if r['error']:
+        print(f"{r['case']:<17}{r['rows']:>12,}  ❌ {r['error']}")
+        return
+    rss = '-' if r['peak_rss_mb'] is None else f"{r['peak_rss_mb']:.0f}"
+    print(f"{r['case']:<17}{r['rows']:>12,}{r['seconds']:>10.2f}{r['rows_per_s']:>13,}{rss:>10}")
+
+# prints time and memory against an earlier results file for the (case, rows) pairs in both
+def compare(results, previous_file, threshold=0.10):
+    with open(previous_file) as f:
+        previous = json.load(f)
+    before = {(r['case'], r['rows']): r for r in previous['results'] if not r['error']}
+    print(f"\nCompared with {previous_file} (commit {previous.get('commit') or '?'}):")
+    for r in results:
+        old = before.get((r['case'], r['rows']))
+        if r['error'] or not old:
+            continue
+        change = r['seconds'] / old['seconds'] - 1
+        mark = '⚠️' if change > threshold else '  '
+        rss = ''
+        if r['peak_rss_mb'] and old['peak_rss_mb']:
+            rss = f", peak RSS {r['peak_rss_mb'] / old['peak_rss_mb'] - 1:+.0%}"
+        print(f"{mark} {r['case']:<17}{r['rows']:>12,}  time {change:+.0%} ({old['seconds']:.2f}s -> {r['seconds']:.2f}s){rss}")
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmarks for tasks 1-4")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--rows', nargs='+', default=['10k', '1m'], help="sizes such as 10k 1m 10m")
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--dirty', type=float, default=0.05, help="share of dirty leads")
+    parser.add_argument('--duplicates', type=float, default=0.05, help="share of duplicate leads")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--mail-limit', type=int, default=20_000, help="most messages sent by bulk_mail")
+    parser.add_argument('--data-dir', default=os.path.join(HERE, 'data'))
+    parser.add_argument('--work-dir', default=os.path.join(HERE, 'work'))
+    parser.add_argument('--output', help="results file (default results/<time>_<commit>.json)")
+    parser.add_argument('--compare', help="earlier results file to compare with")
+    args = parser.parse_args()
+    if args.child:
+        return run_child(json.loads(args.child))
+
+    commit = _git_commit()
+    started = datetime.now()
+    output = args.output or os.path.join(HERE, 'results', f"{started:%Y%m%d-%H%M%S}_{commit or 'nogit'}.json")
+    results = []
+    print(f"{'Case':<17}{'Rows':>12}{'Seconds':>10}{'Rows/s':>13}{'Peak MB':>10}")
+    for rows in map(parse_rows, args.rows):
+        leads = write_leads(args.data_dir, rows, args.dirty, args.duplicates, args.seed)
+        sales = write_sales(args.data_dir, rows, args.seed)
+        workdir = os.path.join(os.path.abspath(args.work_dir), str(rows))
+        shutil.rmtree(workdir, ignore_errors=True)
+        for case in args.cases:
+            ctx = {'case': case, 'rows': rows, 'leads': leads, 'sales': sales, 'mail_limit': args.mail_limit,
+                   'workdir': os.path.join(workdir, case), 'result': os.path.join(workdir, f"{case}.json")}
+            if case in ('generate_report', 'bulk_mail'):
+                ctx['workdir'] = os.path.join(workdir, 'clean_leads')  # reuses its clean_customers.csv
+            results.append(run_case(ctx))
+            print_result(results[-1])
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'commit': commit, 'started': started.isoformat(timespec='seconds'),
+                   'python': platform.python_version(), 'platform': platform.platform(),
+                   'cpus': os.cpu_count(), 'seed': args.seed, 'dirty': args.dirty,
+                   'duplicates': args.duplicates, 'results': results}, f, indent=2)
+    print(f"\n📄 Results saved to '{output}'")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#  Benchmark: per-row Series.apply(re.match) vs column-wise validate_emails()
+#  Usage: python bench_email_validation.py [--sizes 100000 1000000 10000000]
+
+import argparse
+import re
+import time
+import numpy as np
+import pandas as pd
+from email_validation import validate_emails
+
+# the original per-row check from clean_leads.py
+def legacy_is_valid_email(email):
+    pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
+    return bool(re.match(pattern, str(email)))
+
+# synthetic emails with roughly 10% invalid / messy values
+def make_emails(n, seed=42):
+    rng = np.random.default_rng(seed)
+    ids = rng.integers(0, n, size=n).astype(str)
+    emails = pd.Series(np.char.add(np.char.add('User.', ids), '@Example.com '))
+    bad = rng.random(n) < 0.1
+    emails[bad] = 'invalid-email@'
+    return emails
+
+def time_it(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Email validation benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    print(f"{'Rows':>12}{'apply rows/s':>18}{'vectorized rows/s':>22}{'speedup':>10}")
+    for n in args.sizes:
+        emails = make_emails(n)
+        legacy = time_it(lambda: emails.apply(legacy_is_valid_email))
+        vectorized = time_it(lambda: validate_emails(emails))
+        print(f"{n:>12,}{n / legacy:>18,.0f}{n / vectorized:>22,.0f}{legacy / vectorized:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#  Benchmark: blocked duplicate detection (lead_dedupe.py) vs comparing every pair.
+#  Synthetic leads get ~5% injected duplicates (case/space, Gmail dots, +tags, typos).
+#  The all-pairs time is measured on a small sample and extrapolated (n^2 growth).
+#  Usage: python bench_lead_dedupe.py [--sizes 100000 1000000] [--window 5]
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from lead_dedupe import canonical_emails, find_merge_candidates, _similarity
+
+SYLLABLES = ['ka', 'ro', 'mi', 'an', 'ty', 'le', 'son', 'ber', 'vi', 'dor', 'sh', 'el', 'ma', 'ri', 'ton', 'ge']
+DOMAINS = ['gmail.com', 'yahoo.com', 'outlook.com', 'acme.com', 'example.org', 'mail.in']
+
+def make_leads(n, dup_rate=0.05, seed=11):
+    rng = np.random.default_rng(seed)
+    syl = np.array(SYLLABLES)
+
+    def words(count, parts):
+        out = syl[rng.integers(0, len(syl), count)]
+        for _ in range(parts - 1):
+            out = np.char.add(out, syl[rng.integers(0, len(syl), count)])
+        return out
+
+    first, last = words(n, 2), words(n, 3)
+    domains = np.array(DOMAINS)[rng.integers(0, len(DOMAINS), n)]
+    local = np.char.add(np.char.add(np.char.add(first, '.'), last), rng.integers(0, 100, n).astype(str))
+    df = pd.DataFrame({'email': np.char.add(np.char.add(local, '@'), domains),
+                       'name': np.char.add(np.char.add(np.char.capitalize(first), ' '), np.char.capitalize(last))})
+
+    # duplicates of random rows, each with one kind of variation
+    dups = df.sample(int(n * dup_rate), random_state=seed).copy()
+    kind = rng.integers(0, 4, len(dups))
+    email, name = dups['email'].to_numpy(dtype=object), dups['name'].to_numpy(dtype=object)
+    for i, k in enumerate(kind):
+        user, domain = email[i].split('@')
+        if k == 0:
+            email[i] = f' {email[i].upper()} '
+        elif k == 1:
+            email[i] = f'{user}+promo@{domain}'
+        elif k == 2:
+            email[i] = f'{user}@{domain}'.replace('.', '', 1) if domain == 'gmail.com' else f'{user}x@{domain}'
+        else:
+            email[i] = f'{user[:-1]}@{domain}'
+            name[i] = name[i][:-1]
+    dups['email'], dups['name'] = email, name
+    return pd.concat([df, dups], ignore_index=True).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+def all_pairs_seconds(df, sample=1500):
+    rows = df.head(sample)
+    names = rows['name'].str.lower().tolist()
+    locals_ = rows['email'].str.split('@').str[0].tolist()
+    start = time.perf_counter()
+    for i in range(len(rows)):
+        for j in range(i + 1, len(rows)):
+            (_similarity(names[i], names[j]) + _similarity(locals_[i], locals_[j])) / 2
+    pairs = len(rows) * (len(rows) - 1) / 2
+    return (time.perf_counter() - start) / pairs
+
+def main():
+    parser = argparse.ArgumentParser(description="Lead dedupe benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--window', type=int, default=5)
+    args = parser.parse_args()
+
+    per_pair = all_pairs_seconds(make_leads(2000))
+    print(f"{'Leads':>10}{'Exact dups':>12}{'Candidates':>12}{'Canonical s':>13}{'Blocked s':>11}{'All-pairs s (est.)':>20}")
+    for n in args.sizes:
+        df = make_leads(n)
+        start = time.perf_counter()
+        canonical = canonical_emails(df['email'])
+        exact = int(canonical.duplicated().sum())
+        df = df[~canonical.duplicated()]
+        canonical_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        candidates = find_merge_candidates(df, window=args.window)
+        blocked_s = time.perf_counter() - start
+
+        estimate = per_pair * len(df) * (len(df) - 1) / 2
+        print(f"{len(df) + exact:>10,}{exact:>12,}{len(candidates):>12,}{canonical_s:>13.1f}{blocked_s:>11.1f}{estimate:>20,.0f}")
+
+if __name__ == "__main__":
+    main()
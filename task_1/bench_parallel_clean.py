@@ -0,0 +1,53 @@
+#  Benchmark: clean_leads() in one process vs clean_leads_parallel() with N workers.
+#  Also checks that every run writes the same file as the single-process version.
+#  Usage: python bench_parallel_clean.py [--rows 1000000] [--workers 1 2 4 8]
+
+import argparse
+import contextlib
+import filecmp
+import io
+import os
+import shutil
+import tempfile
+import time
+from bench_lead_dedupe import make_leads
+from clean_leads import clean_leads
+from columnar_cache import CACHE_DIR
+from parallel_clean import clean_leads_parallel
+
+def time_it(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel lead cleaning benchmark")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        input_file = os.path.join(tmp, 'company_leads.csv')
+        leads = make_leads(args.rows)
+        leads['phone'] = '+91 98765 43210'
+        leads.to_csv(input_file, index=False)
+        print(f"{len(leads):,} leads, {os.path.getsize(input_file) / 2**20:.0f} MB, {os.cpu_count()} CPUs")
+
+        serial_file = os.path.join(tmp, 'serial.csv')
+        # no Parquet cache, so both sides parse the CSV
+        serial_s = time_it(lambda: clean_leads(input_file, serial_file))
+        shutil.rmtree(os.path.join(tmp, CACHE_DIR), ignore_errors=True)
+        print(f"{'Workers':>8}{'Seconds':>10}{'Speedup':>10}{'Same output':>13}")
+        print(f"{'serial':>8}{serial_s:>10.2f}{1:>10.2f}{'-':>13}")
+        for workers in args.workers:
+            output_file = os.path.join(tmp, f'parallel_{workers}.csv')
+            seconds = time_it(lambda: clean_leads_parallel(input_file, output_file, workers))
+            same = filecmp.cmp(serial_file, output_file, shallow=False)
+            print(f"{workers:>8}{seconds:>10.2f}{serial_s / seconds:>10.2f}{str(same):>13}")
+    finally:
+        shutil.rmtree(tmp)
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,103 @@
 #      Save clean data into clean_customers.csv
 
 import pandas as pd
-import re
+import os
+import sqlite3
+import hashlib
+import tempfile
+from email_validation import is_valid_email, validate_emails
+from phone_validation import normalize_phones
+from lead_dedupe import canonical_emails, find_merge_candidates
+from columnar_cache import read_csv_cached
+from parallel_clean import clean_leads_parallel
+from metrics import span, count
 
-#  format for checking if mail is valid or not from company_leads.csv
-def is_valid_email(email):
-    pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-    return bool(re.match(pattern, str(email)))
+# Remembers which emails were already written while streaming chunks.
+# Emails are kept as 8-byte blake2b digests instead of full strings, and once
+# more than `max_in_memory` digests are held they spill to an on-disk SQLite
+# table so memory stays bounded for very large exports.
+class SeenEmails:
+    def __init__(self, max_in_memory=5_000_000):
+        self.max_in_memory = max_in_memory
+        self._seen = set()
+        self._conn = None
+        self._db_path = None
+
+    @staticmethod
+    def _digest(email):
+        return int.from_bytes(hashlib.blake2b(str(email).encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+    def _spill_to_disk(self):
+        fd, self._db_path = tempfile.mkstemp(suffix='.seen.db')
+        os.close(fd)
+        self._conn = sqlite3.connect(self._db_path)
+        self._conn.execute('PRAGMA journal_mode=OFF')
+        self._conn.execute('PRAGMA synchronous=OFF')
+        self._conn.execute('CREATE TABLE seen (h INTEGER PRIMARY KEY) WITHOUT ROWID')
+        self._conn.executemany('INSERT OR IGNORE INTO seen VALUES (?)', ((h,) for h in self._seen))
+        self._conn.commit()
+        self._seen = set()
+
+    # returns a list of booleans, True for emails not seen in this or any earlier chunk
+    def mark_new(self, emails):
+        digests = [self._digest(e) for e in emails]
+        if self._conn is None and len(self._seen) + len(digests) > self.max_in_memory:
+            self._spill_to_disk()
+
+        if self._conn is None:
+            is_new = []
+            for h in digests:
+                is_new.append(h not in self._seen)
+                self._seen.add(h)
+            return is_new
+
+        is_new = []
+        cur = self._conn.cursor()
+        for h in digests:
+            cur.execute('INSERT OR IGNORE INTO seen VALUES (?)', (h,))
+            is_new.append(cur.rowcount == 1)
+        self._conn.commit()
+        return is_new
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            os.remove(self._db_path)
+            self._conn = None
+
+# Rewrites the 'phone' column (if there is one) in E.164 form and adds a boolean
+# 'phone_valid' column, so senders can pick sendable contacts without re-checking.
+# Returns how many rows have a phone that could not be normalized.
+def normalize_phone_column(df, country_code=None):
+    if 'phone' not in df.columns:
+        return 0
+    checked = normalize_phones(df['phone'], country_code)
+    df['phone'] = checked['phone']
+    df['phone_valid'] = checked['valid']
+    return int((~checked['valid'] & (checked['reason'] != 'missing')).sum())
+
+# writes likely duplicates (same person, different mailbox) for manual review
+def write_merge_report(leads, merge_report):
+    with span('clean.merge_candidates'):
+        candidates = find_merge_candidates(leads)
+    count('merge_candidates', len(candidates))
+    candidates.to_csv(merge_report, index=False)
+    print(f"🔎 {len(candidates)} possible duplicates written to '{merge_report}'")
 
 # cleaning the data of customers from company_leads.csv file then store the output file in the clean_customers.csv
-def clean_leads(input_file='company_leads.csv', output_file='clean_customers.csv'):
+# (everything is read as text so phones like '+91...' are not turned into numbers; the parsed
+# text is kept as Parquet and reused until the CSV changes). workers > 1 runs the sharded
+# multi-process version from parallel_clean.py.
+def clean_leads(input_file='company_leads.csv', output_file='clean_customers.csv', chunksize=None, country_code=None,
+                merge_report=None, workers=None):
+    if workers and workers > 1:
+        return clean_leads_parallel(input_file, output_file, workers, country_code, merge_report)
+    if chunksize:
+        return clean_leads_streaming(input_file, output_file, chunksize, country_code, merge_report)
+
     try:
-        df = pd.read_csv(input_file)
+        with span('clean.read'):
+            df = read_csv_cached(input_file, date_columns=(), dtype=str)
     except FileNotFoundError:
         print(f"❌ File '{input_file}' not found.")
         return
@@ -26,20 +112,98 @@ def clean_leads(input_file='company_leads.csv', output_file='clean_customers.csv
         print("📌 Available columns:", df.columns.tolist())
         return
 
-# counting valid email from company_leads.csv list
+# counting valid email from company_leads.csv list (emails are stripped and lowercased)
     initial_count = len(df)
-    df['valid_email'] = df['email'].apply(is_valid_email)
-    df = df[df['valid_email']].drop(columns='valid_email')
+    with span('clean.validate'):
+        checked = validate_emails(df['email'])
+        df['email'] = checked['email']
+        df = df[checked['valid']]
     valid_count = len(df)
 
-# Deleting invalid and duplicated email from company_leads.csv list
-    df_clean = df.drop_duplicates(subset='email')
+# Deleting invalid and duplicated email from company_leads.csv list; emails that reach the
+# same mailbox (Gmail dots, +tags) count as duplicates, the first spelling is kept
+    with span('clean.dedupe'):
+        df_clean = df[~canonical_emails(df['email']).duplicated()].copy()
     final_count = len(df_clean)
+    with span('clean.phones'):
+        invalid_phones = normalize_phone_column(df_clean, country_code)
 
 # Storing valid customer list to clean_customers.csv
-    df_clean.to_csv(output_file, index=False)
+    with span('clean.write'):
+        df_clean.to_csv(output_file, index=False)
+    count_cleaned(initial_count, valid_count, final_count, invalid_phones)
+    print(f"✅ Cleaned data saved to '{output_file}'")
+    print(f"📊 Initial: {initial_count}, Valid: {valid_count}, Final: {final_count}, Invalid phones: {invalid_phones}")
+    if merge_report:
+        write_merge_report(df_clean, merge_report)
+
+def count_cleaned(initial_count, valid_count, final_count, invalid_phones):
+    count('leads_read', initial_count)
+    count('leads_invalid_email', initial_count - valid_count)
+    count('leads_duplicate', valid_count - final_count)
+    count('leads_written', final_count)
+    count('leads_invalid_phone', invalid_phones)
+
+# same cleaning as clean_leads() but reads the input `chunksize` rows at a time and
+# appends each cleaned chunk to the output, so memory depends on chunk size only
+# For the merge report only the email and name of every written row are kept in memory.
+def clean_leads_streaming(input_file='company_leads.csv', output_file='clean_customers.csv', chunksize=100_000,
+                          country_code=None, merge_report=None):
+    try:
+        reader = pd.read_csv(input_file, chunksize=chunksize, dtype=str)
+    except FileNotFoundError:
+        print(f"❌ File '{input_file}' not found.")
+        return
+
+    seen = SeenEmails()
+    initial_count, valid_count, final_count, invalid_phones = 0, 0, 0, 0
+    header_written = False
+    kept = []
+
+    try:
+        while True:
+            with span('clean.read'):
+                chunk = next(reader, None)
+            if chunk is None:
+                break
+            chunk.columns = chunk.columns.str.strip().str.lower()
+
+            if 'email' not in chunk.columns:
+                print("❌ 'email' column not found in the dataset.")
+                print("📌 Available columns:", chunk.columns.tolist())
+                return
+
+            initial_count += len(chunk)
+            with span('clean.validate'):
+                checked = validate_emails(chunk['email'])
+                chunk['email'] = checked['email']
+                chunk = chunk[checked['valid']]
+            valid_count += len(chunk)
+
+            # drop duplicates inside the chunk first, then against everything already written
+            with span('clean.dedupe'):
+                canonical = canonical_emails(chunk['email'])
+                chunk, canonical = chunk[~canonical.duplicated()], canonical[~canonical.duplicated()]
+                chunk = chunk[seen.mark_new(canonical)].copy()
+            final_count += len(chunk)
+            with span('clean.phones'):
+                invalid_phones += normalize_phone_column(chunk, country_code)
+            if merge_report:
+                kept.append(chunk[[c for c in ('email', 'name') if c in chunk.columns]])
+
+            with span('clean.write'):
+                chunk.to_csv(output_file, mode='a' if header_written else 'w', header=not header_written,
+                             index=False)
+            header_written = True
+    finally:
+        reader.close()
+        seen.close()
+
+    count_cleaned(initial_count, valid_count, final_count, invalid_phones)
     print(f"✅ Cleaned data saved to '{output_file}'")
-    print(f"📊 Initial: {initial_count}, Valid: {valid_count}, Final: {final_count}")
+    print(f"📊 Initial: {initial_count}, Valid: {valid_count}, Final: {final_count}, Invalid phones: {invalid_phones}")
+    if merge_report and kept:
+        write_merge_report(pd.concat(kept, ignore_index=True), merge_report)
 
 if __name__ == "__main__":
     clean_leads()
@@ -0,0 +1,13 @@
+#  Parquet working copy of CSV inputs.
+#  The code lives in task_3/columnar_cache.py; this file loads it under the same module name, so the
+#  scripts in this folder keep importing 'columnar_cache' and share one copy of the code.
+
+import importlib.util
+import os
+import sys
+
+_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'task_3', 'columnar_cache.py')
+_spec = importlib.util.spec_from_file_location(__name__, _path)
+_module = importlib.util.module_from_spec(_spec)
+sys.modules[__name__] = _module
+_spec.loader.exec_module(_module)
@@ -0,0 +1,13 @@
+#  Date handling shared by the lead report and the sales analyzer.
+#  The code lives in task_3/date_parsing.py; this file loads it under the same module name, so the
+#  scripts in this folder keep importing 'date_parsing' and share one copy of the code.
+
+import importlib.util
+import os
+import sys
+
+_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'task_3', 'date_parsing.py')
+_spec = importlib.util.spec_from_file_location(__name__, _path)
+_module = importlib.util.module_from_spec(_spec)
+sys.modules[__name__] = _module
+_spec.loader.exec_module(_module)
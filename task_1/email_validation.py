@@ -0,0 +1,42 @@
+#  Column-wise email validation used by the lead cleaner.
+#  Instead of calling re.match once per row through Series.apply, whole
+#  columns are normalized (strip + lowercase) and matched in one pass.
+
+import re
+import numpy as np
+import pandas as pd
+
+EMAIL_PATTERN = re.compile(r'[\w\.+-]+@[\w\.-]+\.\w+')
+
+# rejection reasons written to the 'reason' column ('' means the email is valid)
+REASON_MISSING = 'missing'
+REASON_NO_AT = 'missing @'
+REASON_BAD_FORMAT = 'bad format'
+
+# single value check, kept for places that validate one email at a time (e.g. manual entry)
+def is_valid_email(email):
+    return EMAIL_PATTERN.fullmatch(str(email).strip()) is not None
+
+# validates a whole column of emails at once and returns a DataFrame with
+#   email  - normalized email (stripped, lowercased when normalize=True)
+#   valid  - boolean mask
+#   reason - why the email was rejected, '' for valid rows
+def validate_emails(emails, normalize=True):
+    emails = emails.astype('string').str.strip()
+    if normalize:
+        emails = emails.str.lower()
+
+    missing = emails.isna() | (emails == '')
+    valid = emails.str.fullmatch(EMAIL_PATTERN).fillna(False).astype(bool)
+    no_at = ~emails.str.contains('@', regex=False).fillna(False).astype(bool)
+
+    missing = missing.to_numpy(dtype=bool)
+    valid = valid.to_numpy(dtype=bool)
+    no_at = no_at.to_numpy(dtype=bool)
+    reason = np.select(
+        [valid, missing, no_at],
+        ['', REASON_MISSING, REASON_NO_AT],
+        default=REASON_BAD_FORMAT,
+    )
+
+    return pd.DataFrame({'email': emails, 'valid': valid, 'reason': reason}, index=emails.index)
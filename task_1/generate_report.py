@@ -5,8 +5,17 @@
 
 import pandas as pd
 import os
+import io
+import hashlib
+import sqlite3
+from date_parsing import parse_dates, week_codes, week_labels
+from columnar_cache import read_csv_cached, bad_date_count
+from metrics import span, count
+from excel_writer import write_excel
 
-def generate_report(input_file='clean_customers.csv', output_file='leads_reports.xlsx'):
+# date_format: strftime format of the 'date' column, detected from the data when not given
+def generate_report(input_file='clean_customers.csv', output_file='leads_reports.xlsx',
+                    excel_engine='auto', sidecar=(), sidecar_format='csv', date_format=None):
     # Check if file exists and this is not empty
     if not os.path.exists(input_file):
         print(f"❌ File '{input_file}' not found.")
@@ -16,7 +25,9 @@ def generate_report(input_file='clean_customers.csv', output_file='leads_reports
         return
 
     try:
-        df = pd.read_csv(input_file)
+        # typed Parquet copy of the CSV (dates already parsed), re-read only when the CSV changes
+        with span('report.read'):
+            df = read_csv_cached(input_file, date_format=date_format)
     except Exception as e:
         print(f"❌ Failed to read '{input_file}': {e}")
         return
@@ -28,32 +39,186 @@ def generate_report(input_file='clean_customers.csv', output_file='leads_reports
         print("📌 Available columns:", df.columns.tolist())
         return
 
-    # Convert 'date' column to datetime so that it can be tracked
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    # 'date' is already a datetime column; unreadable dates are NaT and were counted
+    # when the CSV was parsed
+    count('report_rows', len(df))
+    bad_dates = bad_date_count(df, 'date')
+    if bad_dates:
+        print(f"⚠️ {bad_dates} rows with an unreadable date were skipped")
+        count('report_bad_dates', bad_dates)
     df = df.dropna(subset=['date'])
 
     if df.empty:
         print("⚠️ No valid date entries found. Report generation skipped.")
         return
 
-    # Daily lead count of customers
-    daily_counts = df.groupby(df['date'].dt.date).size().reset_index(name='Daily Leads')
+    with span('report.aggregate'):
+        # Daily lead count of customers (grouped on datetime64 values, only the day labels become date objects)
+        daily_counts = df.groupby(df['date'].dt.normalize()).size().reset_index(name='Daily Leads')
+        daily_counts['date'] = daily_counts['date'].dt.date
 
-    # Weekly lead count of customers
-    df['week'] = df['date'].dt.strftime('%Y-W%U')
-    weekly_counts = df.groupby('week').size().reset_index(name='Weekly Leads')
+        # Weekly lead count of customers, grouped by integer week codes and labelled 'YYYY-Www' afterwards
+        weeks = week_codes(df['date'])
+        weekly_counts = weeks.value_counts().sort_index()
+        labels = week_labels(weekly_counts.index)
+        df['week'] = weeks.map(dict(zip(weekly_counts.index, labels)))
+        weekly_counts = pd.DataFrame({'week': labels.values, 'Weekly Leads': weekly_counts.values})
 
-    # Unique customers by email list
-    unique_customers = df.drop_duplicates(subset='email')
+        # Unique customers by email list
+        unique_customers = df.drop_duplicates(subset='email')
 
     # Write to Excel file by email list
-    with pd.ExcelWriter(output_file) as writer:
-        daily_counts.to_excel(writer, sheet_name='Daily Leads', index=False)
-        weekly_counts.to_excel(writer, sheet_name='Weekly Leads', index=False)
-        unique_customers.to_excel(writer, sheet_name='Unique Customers', index=False)
+    with span('report.export'):
+        write_excel(output_file, [
+            ('Daily Leads', daily_counts),
+            ('Weekly Leads', weekly_counts),
+            ('Unique Customers', unique_customers),
+        ], engine=excel_engine, sidecar=sidecar, sidecar_format=sidecar_format)
 
     print(f"✅ Report generated and saved as '{output_file}'")
     print(f"📊 Daily: {len(daily_counts)}, Weekly: {len(weekly_counts)}, Unique Customers: {len(unique_customers)}")
 
+# -- incremental mode --
+# Running totals for one input CSV, kept in a small SQLite file next to the report:
+#   report_mark     byte offset up to which the CSV was processed (the high-water mark),
+#                   its column names and a hash of the first bytes to notice a rewritten file
+#   daily_counts    leads per day
+#   weekly_counts   leads per week
+#   seen_emails     every email already written to the unique customers file
+class LeadReportState:
+    def __init__(self, state_file):
+        self.conn = sqlite3.connect(state_file)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS report_mark (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                input_file TEXT, byte_offset INTEGER, columns TEXT, fingerprint TEXT
+            );
+            CREATE TABLE IF NOT EXISTS daily_counts (day TEXT PRIMARY KEY, leads INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS weekly_counts (week TEXT PRIMARY KEY, leads INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS seen_emails (email TEXT PRIMARY KEY) WITHOUT ROWID;
+        ''')
+
+    # returns (byte_offset, columns, fingerprint) or None when nothing was processed yet
+    def mark(self, input_file):
+        row = self.conn.execute('SELECT byte_offset, columns, fingerprint FROM report_mark '
+                                'WHERE id = 1 AND input_file = ?', (os.path.abspath(input_file),)).fetchone()
+        return (row[0], row[1].split('\x1f'), row[2]) if row else None
+
+    def save_mark(self, input_file, byte_offset, columns, fingerprint):
+        self.conn.execute('INSERT OR REPLACE INTO report_mark VALUES (1, ?, ?, ?, ?)',
+                          (os.path.abspath(input_file), byte_offset, '\x1f'.join(columns), fingerprint))
+
+    def reset(self):
+        self.conn.executescript('DELETE FROM report_mark; DELETE FROM daily_counts; '
+                                'DELETE FROM weekly_counts; DELETE FROM seen_emails;')
+
+    def add_counts(self, table, key_column, counts):
+        self.conn.executemany(f'INSERT INTO {table} VALUES (?, ?) '
+                              f'ON CONFLICT({key_column}) DO UPDATE SET leads = leads + excluded.leads',
+                              ((str(k), int(v)) for k, v in counts.items()))
+
+    # returns a list of booleans, True for emails not written in an earlier run
+    def mark_new(self, emails):
+        cur = self.conn.cursor()
+        is_new = []
+        for email in emails:
+            cur.execute('INSERT OR IGNORE INTO seen_emails VALUES (?)', (str(email),))
+            is_new.append(cur.rowcount == 1)
+        return is_new
+
+    def counts(self, table, key_column, label):
+        return pd.read_sql_query(f'SELECT {key_column}, leads AS "{label}" FROM {table} ORDER BY {key_column}',
+                                 self.conn)
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+# hash of the first bytes of the CSV, to notice when it was replaced instead of appended to
+def _csv_fingerprint(path, up_to):
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(min(up_to, 64 * 1024)), digest_size=16).hexdigest()
+
+# Same report as generate_report(), but only the rows appended to the CSV since the last
+# run are read and parsed; their counts are merged into the stored totals. The workbook
+# holds the daily and weekly counts and is small enough to rewrite every time; unique
+# customers go to '<output>_Unique Customers.csv', which new customers are appended to.
+# A truncated or replaced CSV (or a missing customers file) triggers a full rebuild.
+def generate_report_incremental(input_file='clean_customers.csv', output_file='leads_reports.xlsx',
+                                state_file=None, excel_engine='auto', date_format=None):
+    if not os.path.exists(input_file):
+        print(f"❌ File '{input_file}' not found.")
+        return
+    if os.path.getsize(input_file) == 0:
+        print(f"⚠️ File '{input_file}' is empty. Cannot generate report.")
+        return
+
+    base = os.path.splitext(output_file)[0]
+    customers_file = f"{base}_Unique Customers.csv"
+    state = LeadReportState(state_file or f"{base}.state.db")
+    try:
+        with open(input_file, 'rb') as f:
+            header = f.readline()
+            columns = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+            mark = state.mark(input_file)
+            size = os.path.getsize(input_file)
+            if (mark is None or mark[0] > size or mark[1] != columns
+                    or mark[2] != _csv_fingerprint(input_file, mark[0]) or not os.path.exists(customers_file)):
+                if mark is not None:
+                    print("♻️ Input changed since the last run, rebuilding the report state")
+                state.reset()
+                mark = (f.tell(), columns, None)
+            f.seek(mark[0])
+            data = f.read()
+
+        # only whole lines are processed; a line still being written is picked up next run
+        data = data[:data.rfind(b'\n') + 1]
+        offset = mark[0] + len(data)
+        first_run = mark[2] is None
+
+        with span('report.read'):
+            if data.strip():
+                df = pd.read_csv(io.BytesIO(data), header=None, names=columns)
+            else:
+                df = pd.DataFrame(columns=columns)
+        count('report_rows', len(df))
+        df.columns = df.columns.str.strip().str.lower()
+        if 'date' not in df.columns or 'email' not in df.columns:
+            print("❌ Required columns 'date' and/or 'email' not found.")
+            print("📌 Available columns:", df.columns.tolist())
+            return
+
+        df['date'], bad_dates = parse_dates(df['date'], date_format)
+        if bad_dates:
+            print(f"⚠️ {bad_dates} new rows with an unreadable date were skipped")
+        df = df.dropna(subset=['date'])
+
+        with span('report.aggregate'):
+            daily = df.groupby(df['date'].dt.normalize()).size()
+            weekly = week_codes(df['date']).value_counts()
+            state.add_counts('daily_counts', 'day', dict(zip(daily.index.strftime('%Y-%m-%d'), daily.values)))
+            state.add_counts('weekly_counts', 'week', dict(zip(week_labels(weekly.index), weekly.values)))
+            new_customers = df.drop_duplicates(subset='email')
+            new_customers = new_customers[state.mark_new(new_customers['email'])]
+
+            daily_counts = state.counts('daily_counts', 'day', 'Daily Leads').rename(columns={'day': 'date'})
+            daily_counts['date'] = pd.to_datetime(daily_counts['date']).dt.date
+            weekly_counts = state.counts('weekly_counts', 'week', 'Weekly Leads')
+        with span('report.export'):
+            write_excel(output_file, [('Daily Leads', daily_counts), ('Weekly Leads', weekly_counts)],
+                        engine=excel_engine)
+            new_customers.to_csv(customers_file, mode='w' if first_run else 'a', header=first_run, index=False)
+
+        state.save_mark(input_file, offset, columns, _csv_fingerprint(input_file, offset))
+        state.commit()
+    finally:
+        state.close()
+
+    print(f"✅ Report updated and saved as '{output_file}' (unique customers in '{customers_file}')")
+    print(f"📊 New rows: {len(df)}, New unique customers: {len(new_customers)}, "
+          f"Days: {len(daily_counts)}, Weeks: {len(weekly_counts)}")
+
 if __name__ == "__main__":
     generate_report()
\ No newline at end of file
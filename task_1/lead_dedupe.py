@@ -0,0 +1,190 @@
+#  Duplicate detection for leads used by the lead cleaner.
+#    Emails are canonicalized (case, whitespace, Gmail dots, +tags) so that
+#    variants of one mailbox collapse to the same key before exact dedupe.
+#    Near-duplicates (typos, same person under two addresses) are found with
+#    blocking: rows are only compared with their neighbours inside a block
+#    (same email domain, or same phonetic name key), so the work grows with
+#    rows x window instead of rows x rows.
+
+import difflib
+import numpy as np
+import pandas as pd
+
+# providers that ignore dots in the local part
+DOTLESS_DOMAINS = {'gmail.com': 'gmail.com', 'googlemail.com': 'gmail.com'}
+# providers that deliver user+anything@ to user@
+PLUS_ADDRESSING_DOMAINS = {'gmail.com', 'outlook.com', 'hotmail.com', 'live.com', 'icloud.com',
+                           'me.com', 'fastmail.com', 'protonmail.com', 'proton.me'}
+
+# returns a Series of mailbox keys: two emails with the same key reach the same inbox
+def canonical_emails(emails):
+    emails = emails.astype('string').str.strip().str.lower()
+    parts = emails.str.rsplit('@', n=1, expand=True)
+    if parts.shape[1] < 2:
+        return emails
+    local, domain = parts[0], parts[1]
+
+    domain = domain.replace(DOTLESS_DOMAINS)
+    plus = domain.isin(PLUS_ADDRESSING_DOMAINS).fillna(False).astype(bool)
+    local = local.where(~plus, local.str.split('+', n=1).str[0])
+    dotless = domain.isin(set(DOTLESS_DOMAINS.values())).fillna(False).astype(bool)
+    local = local.where(~dotless, local.str.replace('.', '', regex=False))
+
+    return (local + '@' + domain).where(domain.notna(), emails)
+
+_SOUNDEX_CODES = str.maketrans('bfpvcgjkqsxzdtlmnr', '111122222222334556')
+
+def soundex(word):
+    letters = ''.join(ch for ch in word.lower() if 'a' <= ch <= 'z')
+    if not letters:
+        return ''
+    codes = letters.translate(_SOUNDEX_CODES)
+    key, last = letters[0].upper(), codes[0]
+    for ch, code in zip(letters[1:], codes[1:]):
+        if code.isdigit() and code != last:
+            key += code
+            if len(key) == 4:
+                break
+        if ch not in 'hw':
+            last = code
+    return key.ljust(4, '0')
+
+# phonetic blocking key for a name: soundex of the last word + first initial,
+# so 'Jon Smyth' and 'John Smith' share 'S530J'. Computed once per distinct name.
+def name_keys(names):
+    names = names.astype('string').str.strip().str.lower()
+    unique = names.dropna().unique()
+    keys = {}
+    for name in unique:
+        words = name.split()
+        keys[name] = soundex(words[-1]) + words[0][:1].upper() if words else ''
+    return names.map(keys).fillna('')
+
+def _similarity(a, b):
+    if not a or not b:
+        return 0.0
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+# character histogram per string: a-z, 0-9 and one bin for everything else. Takes one
+# byte per character (see _ascii_bytes), so the counts and lengths are in characters
+# like SequenceMatcher's.
+_CHAR_BINS = np.full(256, 36, dtype=np.int64)
+_CHAR_BINS[np.frombuffer(b'abcdefghijklmnopqrstuvwxyz', dtype=np.uint8)] = np.arange(26)
+_CHAR_BINS[np.frombuffer(b'0123456789', dtype=np.uint8)] = np.arange(26, 36)
+_CHAR_BINS[0] = 37  # padding, dropped below
+
+def _char_counts(strings, chunk=100_000):
+    counts = np.zeros((len(strings), 37), dtype=np.uint8)
+    for start in range(0, len(strings), chunk):
+        block = np.array(strings[start:start + chunk], dtype=bytes)
+        codes = _CHAR_BINS[block.view(np.uint8).reshape(len(block), -1)]
+        rows = np.repeat(np.arange(len(block)), codes.shape[1])
+        hist = np.bincount(rows * 38 + codes.ravel(), minlength=len(block) * 38).reshape(len(block), 38)
+        counts[start:start + chunk] = np.minimum(hist[:, :37], 255)
+    return counts
+
+# every non-ASCII character becomes one '?' (the "other" bin): UTF-8 would count 'ë'
+# as two bytes and make the bound below too low for accented names
+def _ascii_bytes(strings):
+    return [s.encode('ascii', 'replace') for s in strings]
+
+# Upper bound of SequenceMatcher.ratio() for every pair (a[i], b[i]), computed with
+# numpy: matching characters can't exceed the overlap of the two character histograms,
+# which is what SequenceMatcher.quick_ratio() uses too.
+def _ratio_bound(counts, lengths, a, b, chunk=1_000_000):
+    bound = np.zeros(len(a))
+    for start in range(0, len(a), chunk):
+        i, j = a[start:start + chunk], b[start:start + chunk]
+        common = np.minimum(counts[i], counts[j]).sum(axis=1, dtype=np.int64)
+        total = (lengths[i] + lengths[j]).astype(float)
+        bound[start:start + chunk] = np.divide(2 * common, total, out=np.zeros_like(total), where=total > 0)
+    return bound
+
+# mean of name and email local-part similarity; the second comparison is skipped
+# when the first one already rules the pair out
+def _pair_score(name_a, name_b, local_a, local_b, threshold):
+    name_sim = _similarity(name_a, name_b)
+    if (name_sim + 1) / 2 < threshold:
+        return name_sim / 2
+    return (name_sim + _similarity(local_a, local_b)) / 2
+
+# positions of rows that share a block and are at most `window - 1` places apart once
+# sorted by (block, sort_key); returns two int arrays (left, right) of row positions
+def _neighbour_pairs(block, sort_key, window):
+    frame = pd.DataFrame({'block': block, 'sort': sort_key, 'pos': np.arange(len(block))})
+    frame = frame[frame['block'] != ''].sort_values(['block', 'sort'], kind='stable')
+    blocks = frame['block'].to_numpy()
+    positions = frame['pos'].to_numpy()
+    left, right = [], []
+    for offset in range(1, window):
+        same = blocks[:-offset] == blocks[offset:]
+        left.append(positions[:-offset][same])
+        right.append(positions[offset:][same])
+    if not left:
+        return np.array([], dtype=int), np.array([], dtype=int)
+    return np.concatenate(left), np.concatenate(right)
+
+# Finds likely duplicate leads among rows whose canonical emails differ.
+# Candidate pairs come from two blocking passes, each a sorted-neighbourhood scan:
+#   'same domain'   - rows with the same email domain, sorted by local part
+#   'similar name'  - rows with the same phonetic name key, sorted by email
+# Every candidate pair is scored as the mean of name and local-part similarity and kept
+# when the score reaches `threshold`. Returns a DataFrame with one row per pair:
+#   row_a, row_b (index labels of df), email_a, email_b, name_a, name_b, score, block
+def find_merge_candidates(df, threshold=0.85, window=5, email_col='email', name_col='name'):
+    columns = ['row_a', 'row_b', 'email_a', 'email_b', 'name_a', 'name_b', 'score', 'block']
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    emails = df[email_col].astype('string').str.strip().str.lower()
+    canonical = canonical_emails(emails)
+    parts = canonical.str.rsplit('@', n=1, expand=True)
+    local = parts[0].fillna('')
+    domain = parts[1].fillna('') if parts.shape[1] > 1 else pd.Series('', index=df.index)
+    if name_col in df.columns:
+        names = df[name_col].astype('string').str.strip().str.lower().fillna('')
+        phonetic = name_keys(names)
+    else:
+        names = pd.Series('', index=df.index)
+        phonetic = pd.Series('', index=df.index)
+
+    passes = [('same domain', domain, local), ('similar name', phonetic, canonical.fillna(''))]
+    found = []
+    for label, block, sort_key in passes:
+        a, b = _neighbour_pairs(block.to_numpy(dtype=object), sort_key.to_numpy(dtype=object), window)
+        found.append(pd.DataFrame({'a': np.minimum(a, b), 'b': np.maximum(a, b), 'block': label}))
+    pairs = pd.concat(found, ignore_index=True).drop_duplicates(subset=['a', 'b'])
+
+    canonical_arr = canonical.to_numpy(dtype=object)
+    pairs = pairs[canonical_arr[pairs['a']] != canonical_arr[pairs['b']]]
+    if pairs.empty:
+        return pd.DataFrame(columns=columns)
+
+    # pairs whose similarity upper bound is already below the threshold are dropped
+    # before any (slow, per pair) SequenceMatcher scoring
+    names_arr = names.to_numpy(dtype=object)
+    local_arr = local.to_numpy(dtype=object)
+    a, b = pairs['a'].to_numpy(), pairs['b'].to_numpy()
+    name_bytes = _ascii_bytes(names_arr)
+    local_bytes = _ascii_bytes(local_arr)
+    bound = (_ratio_bound(_char_counts(name_bytes), np.array([len(n) for n in name_bytes]), a, b)
+             + _ratio_bound(_char_counts(local_bytes), np.array([len(l) for l in local_bytes]), a, b)) / 2
+    plausible = bound >= threshold
+    a, b, block_labels = a[plausible], b[plausible], pairs['block'].to_numpy()[plausible]
+
+    scores = np.fromiter((_pair_score(names_arr[i], names_arr[j], local_arr[i], local_arr[j], threshold)
+                          for i, j in zip(a, b)), dtype=float, count=len(a))
+    keep = scores >= threshold
+    a, b = a[keep], b[keep]
+
+    index = df.index.to_numpy()
+    raw_emails = df[email_col].to_numpy(dtype=object)
+    raw_names = df[name_col].to_numpy(dtype=object) if name_col in df.columns else np.full(len(df), None)
+    result = pd.DataFrame({
+        'row_a': index[a], 'row_b': index[b],
+        'email_a': raw_emails[a], 'email_b': raw_emails[b],
+        'name_a': raw_names[a], 'name_b': raw_names[b],
+        'score': scores[keep].round(3),
+        'block': block_labels[keep],
+    })
+    return result.sort_values('score', ascending=False, kind='stable').reset_index(drop=True)
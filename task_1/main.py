@@ -12,8 +12,9 @@
 #     Generates output as leads_report.xlsx
 
 import argparse
+import metrics
 from clean_leads import clean_leads
-from generate_report import generate_report
+from generate_report import generate_report, generate_report_incremental
 
 def main():
     parser = argparse.ArgumentParser(description="Lead Cleaning and Reporting Tool")
@@ -21,17 +22,41 @@ def main():
     parser.add_argument('--report', action='store_true', help="Generate lead report")
     parser.add_argument('--input', type=str, default='company_leads.csv', help="Input file path")
     parser.add_argument('--output', type=str, help="Output file path")
+    parser.add_argument('--chunksize', type=int, help="Stream the input in chunks of N rows while cleaning")
+    parser.add_argument('--country-code', type=str, help="Country code for phones written without one, e.g. 91")
+    parser.add_argument('--workers', type=int, help="Clean with N worker processes (input split into shards)")
+    parser.add_argument('--merge-report', type=str, help="Write likely duplicate leads to this CSV for review")
+    parser.add_argument('--date-format', type=str,
+                        help="Report: strftime format of the date column, e.g. %%d/%%m/%%Y (detected when omitted)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Report: only process rows appended since the last run and merge them into stored counts")
+
+    parser.add_argument('--metrics', type=str,
+                        help="Record stage timings and counters to this file (.prom: Prometheus text, else JSON lines)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Run each action under cProfile and tracemalloc and print the hot spots")
 
     args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+    call = metrics.profile if args.profile else lambda func, *a, **kw: func(*a, **kw)
 
     if args.clean:
         output_file = args.output if args.output else 'clean_customers.csv'
-        clean_leads(input_file=args.input, output_file=output_file)
+        call(clean_leads, input_file=args.input, output_file=output_file, chunksize=args.chunksize,
+             country_code=args.country_code, merge_report=args.merge_report, workers=args.workers)
 
     if args.report:
         input_file = args.input if args.input else 'clean_customers.csv'
         output_file = args.output if args.output else 'leads_reports.xlsx'
-        generate_report(input_file=input_file, output_file=output_file)
+        if args.incremental:
+            call(generate_report_incremental, input_file=input_file, output_file=output_file,
+                 date_format=args.date_format)
+        else:
+            call(generate_report, input_file=input_file, output_file=output_file, date_format=args.date_format)
+
+    if args.metrics:
+        metrics.write_metrics(args.metrics, run='task_1')
 
     if not args.clean and not args.report:
         print("⚠️ Please specify at least one action: --clean or --report")
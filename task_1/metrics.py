@@ -0,0 +1,128 @@
+#  Lightweight instrumentation (task_2, task_3 and crm_lite_integrated.py import this file).
+#    span('clean.read'): times a stage; calls and seconds add up per name
+#    count('leads_read', n): counters (rows processed, messages sent/failed, retries)
+#    Both do nothing until enable() is called (main.py --metrics), so a normal run pays
+#    one flag check per call; spans wrap whole stages, never single rows
+#    write_metrics(path): '.prom' -> Prometheus text format (for node_exporter's textfile
+#    collector), anything else -> one JSON line per metric appended to the file
+#    profile(func): runs func under cProfile and tracemalloc (main.py --profile)
+
+import contextlib
+import json
+import os
+import re
+import threading
+import time
+
+PREFIX = 'crm'
+_enabled = False
+_lock = threading.Lock()
+_spans = {}     # name -> [calls, seconds, longest call]
+_counters = {}  # name -> value
+_NO_SPAN = contextlib.nullcontext()
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_span(self.name, time.perf_counter() - self.start)
+
+def span(name):
+    return _Span(name) if _enabled else _NO_SPAN
+
+# adds a stage time measured somewhere else, e.g. returned by a worker process
+def record_span(name, seconds):
+    if not _enabled:
+        return
+    with _lock:
+        stat = _spans.setdefault(name, [0, 0.0, 0.0])
+        stat[0] += 1
+        stat[1] += seconds
+        stat[2] = max(stat[2], seconds)
+
+def count(name, value=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+# ({span: (calls, seconds, longest)}, {counter: value})
+def snapshot():
+    with _lock:
+        return {name: tuple(stat) for name, stat in _spans.items()}, dict(_counters)
+
+def _prometheus_text(spans, counters):
+    metric = lambda name: f"{PREFIX}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}_total"
+    lines = [f"# HELP {PREFIX}_stage_seconds_total Time spent in each stage",
+             f"# TYPE {PREFIX}_stage_seconds_total counter"]
+    lines += [f'{PREFIX}_stage_seconds_total{{stage="{name}"}} {seconds:.6f}' for name, (_, seconds, _) in spans.items()]
+    lines += [f"# HELP {PREFIX}_stage_calls_total Times each stage ran",
+              f"# TYPE {PREFIX}_stage_calls_total counter"]
+    lines += [f'{PREFIX}_stage_calls_total{{stage="{name}"}} {calls}' for name, (calls, _, _) in spans.items()]
+    for name, value in counters.items():
+        lines += [f"# TYPE {metric(name)} counter", f"{metric(name)} {value}"]
+    return '\n'.join(lines) + '\n'
+
+# Writes everything recorded so far. A '.prom' file is replaced atomically (the textfile
+# collector may read it at any time); other files get one JSON object per metric appended,
+# tagged with `run` so several runs can share one file.
+def write_metrics(path, run=None):
+    spans, counters = snapshot()
+    if path.endswith('.prom'):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(_prometheus_text(spans, counters))
+        os.replace(tmp, path)
+    else:
+        stamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+        with open(path, 'a') as f:
+            for name, (calls, seconds, longest) in spans.items():
+                f.write(json.dumps({'time': stamp, 'run': run, 'type': 'span', 'name': name, 'calls': calls,
+                                    'seconds': round(seconds, 6), 'max_seconds': round(longest, 6)}) + '\n')
+            for name, value in counters.items():
+                f.write(json.dumps({'time': stamp, 'run': run, 'type': 'counter', 'name': name,
+                                    'value': value}) + '\n')
+    print(f"📈 Metrics saved to '{path}'")
+
+# Runs func(*args, **kwargs) under cProfile and tracemalloc, prints the `top` functions by
+# cumulative time and the lines that allocated the most memory, and saves the raw profile
+# to stats_file (open with `python -m pstats` or snakeviz). Returns what func returns.
+# tracemalloc makes the run several times slower, so only use it to find hot spots.
+def profile(func, *args, top=20, stats_file='profile.prof', **kwargs):
+    import cProfile
+    import pstats
+    import tracemalloc
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    try:
+        result = profiler.runcall(func, *args, **kwargs)
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        allocations = tracemalloc.take_snapshot().statistics('lineno')[:10]
+        tracemalloc.stop()
+
+    print(f"\n⏱️ Profile of {func.__name__} (top {top} by cumulative time)")
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+    print(f"🧠 Python allocations: peak {peak / 2**20:.1f} MB, still held {current / 2**20:.1f} MB")
+    for stat in allocations:
+        print(f"   {stat}")
+    if stats_file:
+        profiler.dump_stats(stats_file)
+        print(f"📄 Raw profile saved as '{stats_file}'")
+    return result
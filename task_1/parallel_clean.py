@@ -0,0 +1,135 @@
+#  Multi-core version of clean_leads() (main.py --clean --workers N).
+#    1. the input is split into byte ranges that end on line boundaries; each shard is
+#       read, validated and hash-partitioned by mailbox key in a worker process
+#    2. each partition is deduplicated on its own (a mailbox always lands in the same
+#       partition), keeping the first occurrence in file order
+#    3. the survivors are written shard by shard in their original order
+#  The output is the same as clean_leads() produces. Shards are split on raw newlines,
+#  so quoted fields that contain line breaks are not supported in this mode.
+
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from email_validation import validate_emails
+from lead_dedupe import canonical_emails
+from metrics import span
+
+MIN_SHARD_BYTES = 4 * 2**20
+
+# (start, end) byte offsets covering the file after the header, each ending after a '\n'
+def split_byte_ranges(input_file, shards):
+    size = os.path.getsize(input_file)
+    with open(input_file, 'rb') as f:
+        f.readline()
+        start = f.tell()
+        step = max(MIN_SHARD_BYTES, -(-(size - start) // shards))
+        ranges = []
+        while start < size:
+            f.seek(min(start + step, size))
+            if f.tell() < size:
+                f.readline()
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def _read_header(input_file):
+    with open(input_file, 'rb') as f:
+        return pd.read_csv(io.BytesIO(f.readline()), nrows=0).columns.tolist()
+
+# map step: validate one shard and split its valid rows into `partitions` pickles by
+# mailbox key; '_shard' and '_row' remember where every row came from
+def _clean_shard(input_file, columns, shard, start, end, partitions, workdir):
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    if data.strip():
+        df = pd.read_csv(io.BytesIO(data), header=None, names=columns, dtype=str)
+    else:
+        df = pd.DataFrame(columns=columns, dtype=str)
+    df.columns = df.columns.str.strip().str.lower()
+    rows = len(df)
+
+    checked = validate_emails(df['email'])
+    df['email'] = checked['email']
+    df = df[checked['valid']].copy()
+    df['_shard'] = shard
+    df['_row'] = range(len(df))
+    df['_key'] = canonical_emails(df['email'])
+
+    part = pd.util.hash_pandas_object(df['_key'], index=False).to_numpy() % partitions
+    for p in range(partitions):
+        df[part == p].to_pickle(os.path.join(workdir, f"map_{shard}_{p}.pkl"))
+    return rows, len(df)
+
+# reduce step: first occurrence of every mailbox in one partition, then phone
+# normalization on the survivors; results are written back per shard
+def _dedupe_partition(partition, shards, workdir, country_code):
+    from clean_leads import normalize_phone_column
+    pieces = [pd.read_pickle(os.path.join(workdir, f"map_{s}_{partition}.pkl")) for s in range(shards)]
+    df = pd.concat(pieces, ignore_index=True)
+    df = df[~df['_key'].duplicated()].drop(columns='_key')
+    invalid_phones = normalize_phone_column(df, country_code)
+    for shard, group in df.groupby('_shard', sort=False):
+        group.to_pickle(os.path.join(workdir, f"reduce_{shard}_{partition}.pkl"))
+    return len(df), invalid_phones
+
+def clean_leads_parallel(input_file='company_leads.csv', output_file='clean_customers.csv', workers=None,
+                         country_code=None, merge_report=None, shards_per_worker=4):
+    if not os.path.exists(input_file):
+        print(f"❌ File '{input_file}' not found.")
+        return
+    workers = workers or os.cpu_count() or 1
+    columns = _read_header(input_file)
+    if 'email' not in [str(c).strip().lower() for c in columns]:
+        print("❌ 'email' column not found in the dataset.")
+        print("📌 Available columns:", columns)
+        return
+
+    ranges = split_byte_ranges(input_file, workers * shards_per_worker)
+    partitions = workers
+    workdir = tempfile.mkdtemp(prefix='clean_leads_')
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            with span('clean.map'):
+                mapped = list(pool.map(_clean_shard, *zip(*[
+                    (input_file, columns, shard, start, end, partitions, workdir)
+                    for shard, (start, end) in enumerate(ranges)])))
+            with span('clean.reduce'):
+                reduced = list(pool.map(_dedupe_partition, range(partitions), [len(ranges)] * partitions,
+                                        [workdir] * partitions, [country_code] * partitions))
+
+        header_written = False
+        kept = []
+        with span('clean.write'):
+            for shard in range(len(ranges)):
+                paths = [os.path.join(workdir, f"reduce_{shard}_{p}.pkl") for p in range(partitions)]
+                pieces = [pd.read_pickle(path) for path in paths if os.path.exists(path)]
+                if not pieces:
+                    continue
+                chunk = pd.concat(pieces).sort_values('_row').drop(columns=['_shard', '_row'])
+                chunk.to_csv(output_file, mode='a' if header_written else 'w', header=not header_written,
+                             index=False)
+                header_written = True
+                if merge_report:
+                    kept.append(chunk[[c for c in ('email', 'name') if c in chunk.columns]])
+            if not header_written:
+                pd.DataFrame(columns=[str(c).strip().lower() for c in columns]).to_csv(output_file, index=False)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    initial_count = sum(rows for rows, _ in mapped)
+    valid_count = sum(valid for _, valid in mapped)
+    final_count = sum(rows for rows, _ in reduced)
+    invalid_phones = sum(bad for _, bad in reduced)
+    from clean_leads import count_cleaned
+    count_cleaned(initial_count, valid_count, final_count, invalid_phones)
+    print(f"✅ Cleaned data saved to '{output_file}'")
+    print(f"📊 Initial: {initial_count}, Valid: {valid_count}, Final: {final_count}, Invalid phones: {invalid_phones} "
+          f"({len(ranges)} shards, {workers} workers)")
+    if merge_report and kept:
+        from clean_leads import write_merge_report
+        write_merge_report(pd.concat(kept, ignore_index=True), merge_report)
@@ -0,0 +1,54 @@
+#  Column-wise phone normalization used by the lead cleaner.
+#  Whole columns are canonicalized to E.164 ('+' country code + subscriber
+#  number, at most 15 digits) in one pass, so invalid numbers are flagged
+#  once while cleaning instead of at send time.
+
+import re
+import numpy as np
+import pandas as pd
+
+E164_PATTERN = re.compile(r'\+[1-9]\d{6,14}')
+
+# spaces, dashes, dots, brackets and slashes people type between digit groups
+SEPARATORS = r'[\s\-\.\(\)/]'
+
+# rejection reasons written to the 'reason' column ('' means the phone is valid)
+REASON_MISSING = 'missing'
+REASON_NO_COUNTRY_CODE = 'no country code'
+REASON_BAD_FORMAT = 'bad format'
+
+# single value version, e.g. for a phone typed in by hand; returns the E.164 form or None
+def normalize_phone(phone, country_code=None):
+    checked = normalize_phones(pd.Series([phone]), country_code)
+    return checked['phone'].iloc[0] if checked['valid'].iloc[0] else None
+
+# normalizes a whole column of phones at once and returns a DataFrame with
+#   phone  - E.164 form for valid rows, the stripped input otherwise
+#   valid  - boolean mask
+#   reason - why the phone was rejected, '' for valid rows
+# Numbers written with a '00' international prefix get a '+'. Numbers without any
+# prefix only become valid when `country_code` (e.g. '91') is given: a leading trunk
+# '0' is dropped and the country code is put in front.
+def normalize_phones(phones, country_code=None):
+    raw = phones.astype('string').str.strip()
+    digits = raw.str.replace(SEPARATORS, '', regex=True)
+    digits = digits.str.replace(r'^00', '+', regex=True)
+
+    has_prefix = digits.str.startswith('+').fillna(False).astype(bool)
+    if country_code:
+        cc = str(country_code).lstrip('+')
+        local = '+' + cc + digits.str.replace(r'^0', '', regex=True)
+        digits = digits.where(has_prefix, local)
+
+    missing = (raw.isna() | (raw == '')).to_numpy(dtype=bool)
+    valid = digits.str.fullmatch(E164_PATTERN).fillna(False).to_numpy(dtype=bool)
+    bare_digits = digits.str.fullmatch(r'\d{7,15}').fillna(False).to_numpy(dtype=bool)
+    no_prefix = bare_digits & (not country_code)
+    reason = np.select(
+        [valid, missing, no_prefix],
+        ['', REASON_MISSING, REASON_NO_COUNTRY_CODE],
+        default=REASON_BAD_FORMAT,
+    )
+
+    phone = digits.where(pd.Series(valid, index=raw.index), raw)
+    return pd.DataFrame({'phone': phone, 'valid': valid, 'reason': reason}, index=raw.index)
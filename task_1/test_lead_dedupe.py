@@ -0,0 +1,30 @@
+#  Tests for lead_dedupe.py near-duplicate search (run with: python -m pytest task_1)
+
+import difflib
+import numpy as np
+import pandas as pd
+import lead_dedupe
+from lead_dedupe import find_merge_candidates, _ascii_bytes, _char_counts, _ratio_bound
+
+ACCENTED = pd.DataFrame({
+    'name': ['Zoë Müller', 'Zoe Muller', 'José Ñúñez', 'Jose Nunez', 'Renée Dubois', 'Renee Dubois',
+             'Łukasz Wójcik', 'Lukasz Wojcik', 'Amélie Poulain', 'Anna Smith'],
+    'email': ['zoe.muller@acme.com', 'zoe.mueller@acme.com', 'jose.nunez@mail.in', 'jnunez@mail.in',
+              'renee@example.org', 'renee.d@example.org', 'lukasz.w@acme.com', 'lukasz.wojcik@acme.com',
+              'amelie@mail.in', 'anna@mail.in'],
+})
+
+def test_ratio_bound_holds_for_accented_strings():
+    pairs = [('zoë müller', 'zoe muller'), ('ab', 'aé'), ('renée', 'renee'), ('łukasz', 'lukasz')]
+    strings = _ascii_bytes([s for pair in pairs for s in pair])
+    a = np.arange(0, len(strings), 2)
+    bound = _ratio_bound(_char_counts(strings), np.array([len(s) for s in strings]), a, a + 1)
+    for (x, y), upper in zip(pairs, bound):
+        assert difflib.SequenceMatcher(None, x, y).ratio() <= upper + 1e-9
+
+def test_pruning_keeps_accented_duplicates(monkeypatch):
+    pruned = find_merge_candidates(ACCENTED)
+    monkeypatch.setattr(lead_dedupe, '_ratio_bound', lambda counts, lengths, a, b: np.ones(len(a)))
+    unpruned = find_merge_candidates(ACCENTED)
+    pd.testing.assert_frame_equal(pruned, unpruned)
+    assert {'Zoë Müller', 'Renée Dubois'} <= set(pruned['name_a'])
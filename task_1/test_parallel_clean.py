@@ -0,0 +1,41 @@
+#  Tests for the sharded clean_leads() of parallel_clean.py (run with: python -m pytest task_1)
+
+import numpy as np
+import pandas as pd
+import parallel_clean
+from clean_leads import clean_leads
+
+# ~20k leads with mailbox duplicates (case / spaces, +tags, exact repeats) spread across
+# the file, broken emails and local phones without a country code
+def write_leads(path, rows=20_000, seed=3):
+    rng = np.random.default_rng(seed)
+    domains = np.array(['gmail.com', 'outlook.com', 'acme.in', 'mail.com'])
+    ids = rng.integers(0, rows * 3 // 4, rows)
+    local = np.char.add('lead.', ids.astype(str))
+    domain = domains[ids % len(domains)]
+    kind = rng.integers(0, 6, rows)
+    email = np.char.add(np.char.add(local, '@'), domain)
+    email = np.where(kind == 0, np.char.add(np.char.add(' ', np.char.upper(email)), ' '), email)
+    email = np.where(kind == 1, np.char.add(np.char.add(local, '+promo@'), domain), email)
+    email = np.where(kind == 2, np.char.add(local, '@'), email)
+    phone = np.char.add('+91', rng.integers(7_000_000_000, 9_999_999_999, rows).astype(str))
+    phone = np.where(kind == 3, np.char.add('0', np.char.replace(phone, '+91', '')), phone)
+    pd.DataFrame({'name': np.char.add('Lead ', ids.astype(str)), 'email': email, 'phone': phone,
+                  'source': 'CSV', 'date': '2025-01-15'}).to_csv(path, index=False)
+
+def test_parallel_output_matches_serial(tmp_path, monkeypatch):
+    leads = tmp_path / 'leads.csv'
+    write_leads(leads)
+    monkeypatch.setattr(parallel_clean, 'MIN_SHARD_BYTES', 16 * 1024)
+    assert len(parallel_clean.split_byte_ranges(leads, 8)) == 8
+
+    outputs = {}
+    for mode, options in [('serial', {}), ('streaming', {'chunksize': 3000}),
+                          ('parallel', {'workers': 2}), ('parallel_3', {'workers': 3})]:
+        output = tmp_path / f'{mode}.csv'
+        clean_leads(str(leads), str(output), country_code='91', **options)
+        outputs[mode] = output.read_bytes()
+
+    assert outputs['serial'].count(b'\n') > 10_000
+    for mode in ('streaming', 'parallel', 'parallel_3'):
+        assert outputs[mode] == outputs['serial'], mode
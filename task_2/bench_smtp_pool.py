@@ -0,0 +1,55 @@
+#  Benchmark / smoke test for the pooled SMTP sender against a local sink server.
+#  Needs aiosmtpd (pip install aiosmtpd). Nothing leaves the machine.
+#  Usage: python bench_smtp_pool.py [--messages 2000] [--workers 1 4 8] [--rate 0] [--drop-every 0]
+
+import argparse
+from email.message import EmailMessage
+from aiosmtpd.controller import Controller
+from smtp_pool import SMTPPool
+
+# accepts everything; with drop_every=N every Nth message is answered with 421,
+# which makes smtplib close the connection and exercises reconnect + retry
+class SinkHandler:
+    def __init__(self, drop_every=0):
+        self.drop_every = drop_every
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        if self.drop_every and self.received % self.drop_every == 0:
+            return '421 Service closing transmission channel'
+        return '250 OK'
+
+def make_messages(n):
+    for i in range(n):
+        msg = EmailMessage()
+        msg['Subject'] = 'Welcome to Our Community!'
+        msg['From'] = 'bench@localhost'
+        msg['To'] = f'user{i}@example.com'
+        msg.set_content(f'Hi User {i},\n\nThanks for joining.')
+        yield i, msg
+
+def main():
+    parser = argparse.ArgumentParser(description="Pooled SMTP sender benchmark")
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--rate', type=float, default=0, help="messages/second limit, 0 = unlimited")
+    parser.add_argument('--drop-every', type=int, default=0, help="sink answers 421 to every Nth message")
+    args = parser.parse_args()
+
+    handler = SinkHandler(args.drop_every)
+    controller = Controller(handler, hostname='127.0.0.1', port=8025)
+    controller.start()
+    try:
+        print(f"{'Workers':>8}{'Sent':>8}{'Failed':>8}{'Seconds':>10}{'msg/s':>10}")
+        for workers in args.workers:
+            pool = SMTPPool('127.0.0.1', 8025, use_tls=False, workers=workers,
+                            rate=args.rate or None, backoff=0.05)
+            stats = pool.send_all(make_messages(args.messages))
+            print(f"{workers:>8}{stats['sent']:>8}{stats['failed']:>8}"
+                  f"{stats['elapsed']:>10.2f}{stats['throughput']:>10.0f}")
+    finally:
+        controller.stop()
+
+if __name__ == "__main__":
+    main()
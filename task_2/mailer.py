@@ -5,55 +5,87 @@
 #     Maintain an email_log.txt file with details of sent mails
 
 import pandas as pd
-import smtplib
-from email.message import EmailMessage
 from datetime import datetime
 import os
+import threading
+from smtp_pool import SMTPPool
+from template_cache import load_compiled_template, build_email_messages
+from metrics import span, count
 
 def load_template(template_path):
     with open(template_path, 'r') as f:
         return f.read()
 
-def send_bulk_emails(template_file, csv_file='clean_customers.csv', log_file='email_log.txt'):
-    template = load_template(template_file)
-    df = pd.read_csv(csv_file)
+# reads email_log.txt back and returns the set of (recipient, template) pairs already SENT,
+# so an interrupted campaign can be resumed without mailing anyone twice
+def load_sent_index(log_file='email_log.txt'):
+    sent = set()
+    if not os.path.exists(log_file):
+        return sent
+    with open(log_file, 'r') as log:
+        next(log, None)  # header
+        for line in log:
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) >= 5 and parts[2] == 'SENT':
+                sent.add((parts[1], parts[-1]))
+    return sent
+
+def send_bulk_emails(template_file, csv_file='clean_customers.csv', log_file='email_log.txt',
+                     smtp_server='smtp.gmail.com', smtp_port=587,
+                     sender_email='your_email@gmail.com', sender_password='your_app_password',
+                     use_tls=True, workers=4, rate=10, max_retries=3,
+                     resume=False, fsync_every=100):
+    template = load_compiled_template(template_file)
+    with span('mail.read'):
+        df = pd.read_csv(csv_file)
 
-    # SMTP setup
-    smtp_server = 'smtp.gmail.com'
-    smtp_port = 587
-    sender_email = 'your_email@gmail.com'
-    sender_password = 'your_app_password'  # Use app password for Gmail
+    # Resume mode: skip recipients the log already shows as SENT with this template
+    if resume:
+        sent_with_template = {recipient for recipient, used_template in load_sent_index(log_file)
+                              if used_template == template_file}
+        already_sent = df['email'].astype(str).isin(sent_with_template)
+        df = df[~already_sent]
+        count('emails_skipped_resume', int(already_sent.sum()))
+        print(f"⏩ Resuming: {int(already_sent.sum())} already sent, {len(df)} remaining")
 
-    server = smtplib.SMTP(smtp_server, smtp_port)
-    server.starttls()
-    server.login(sender_email, sender_password)
+    # SMTP setup: `workers` connections, at most `rate` messages per second overall
+    # (use an app password for Gmail)
+    pool = SMTPPool(smtp_server, smtp_port, sender_email, sender_password, use_tls=use_tls,
+                    workers=workers, rate=rate, max_retries=max_retries)
 
     # Create log file with header if it doesn't exist
     if not os.path.exists(log_file):
         with open(log_file, 'w') as log:
             log.write("Timestamp\tRecipient\tStatus\tError\tTemplate\n")
 
+    # The log doubles as the resume checkpoint, so it is fsynced every `fsync_every` results
     with open(log_file, 'a') as log:
-        for _, row in df.iterrows():
-            name = row.get('name', 'Customer')
-            recipient = row['email']
-            content = template.format(name=name)
-
-            msg = EmailMessage()
-            msg.set_content(content.split('\n\n', 1)[-1])
-            msg['Subject'] = content.split('\n')[0].replace('Subject: ', '')
-            msg['From'] = sender_email
-            msg['To'] = recipient
+        log_lock = threading.Lock()
+        pending = [0]
 
+        def on_result(recipient, msg, error):
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            with log_lock:
+                if error is None:
+                    log.write(f"{timestamp}\t{recipient}\tSENT\t-\t{template_file}\n")
+                    print(f"✅ Sent to {recipient}")
+                else:
+                    reason = ' '.join(str(error).split())
+                    log.write(f"{timestamp}\t{recipient}\tFAILED\t{reason}\t{template_file}\n")
+                    print(f"❌ Failed to send to {recipient}: {error}")
+                pending[0] += 1
+                if pending[0] >= fsync_every:
+                    log.flush()
+                    os.fsync(log.fileno())
+                    pending[0] = 0
 
-            try:
-                server.send_message(msg)
-                log.write(f"{timestamp}\t{recipient}\tSENT\t-\t{template_file}\n")
-                print(f"✅ Sent to {recipient}")
-            except Exception as e:
-                log.write(f"{timestamp}\t{recipient}\tFAILED\t{e}\t{template_file}\n")
-                print(f"❌ Failed to send to {recipient}: {e}")
-
-    server.quit()
+        messages = build_email_messages(template, df, sender_email)
+        stats = pool.send_all(messages, on_result=on_result)
+        log.flush()
+        os.fsync(log.fileno())
 
+    print(f"📊 Sent: {stats['sent']}, Failed: {stats['failed']}, "
+          f"Throughput: {stats['throughput']:.1f} msg/s in {stats['elapsed']:.1f}s")
+    if stats['aborted']:
+        print(f"🛑 Stopped early, SMTP login failed: {stats['aborted']}, fix it and resume the campaign")
+    return stats
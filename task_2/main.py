@@ -11,10 +11,22 @@
 #     Use pywhatkit library to send fixed template messages to
 #     customers.
 
+import argparse
+import metrics
 from mailer import send_bulk_emails
 from whatsapp_sender import send_whatsapp_messages
 
 def main():
+    parser = argparse.ArgumentParser(description="Bulk email and WhatsApp messaging")
+    parser.add_argument('--metrics', type=str,
+                        help="Record stage timings and counters to this file (.prom: Prometheus text, else JSON lines)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Run the chosen action under cProfile and tracemalloc and print the hot spots")
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+    call = metrics.profile if args.profile else lambda func, *a, **kw: func(*a, **kw)
+
     print("📤 Choose communication channel:")
     print("1. Send Bulk Emails")
     print("2. Send WhatsApp Messages")
@@ -36,7 +48,8 @@ def main():
             print("❌ Invalid email template choice.")
             return
 
-        send_bulk_emails(template_file)
+        resume = input("Resume previous campaign and skip already sent? (y/N): ").strip().lower() == 'y'
+        call(send_bulk_emails, template_file, resume=resume)
 
     elif choice == '2':
         template = (
@@ -44,10 +57,16 @@ def main():
             "Thanks for connecting with us! We're excited to have you on board.\n\n"
             "— Team LeadManager"
         )
-        send_whatsapp_messages(template)
+        resume = input("Resume previous campaign and skip already sent? (y/N): ").strip().lower() == 'y'
+        worker = call(send_whatsapp_messages, template, resume=resume)
+        if args.metrics:
+            worker.join()  # the counters are complete once the queue is drained
 
     else:
         print("❌ Invalid channel choice.")
 
+    if args.metrics:
+        metrics.write_metrics(args.metrics, run='task_2')
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,161 @@
+#  Pooled SMTP sender used by mailer.py
+#    N worker threads, each holding its own SMTP connection
+#    Shared token bucket limiting messages per second
+#    Reconnects on SMTPServerDisconnected and retries each message with backoff
+#    Permanent (5xx) replies fail the message at once; a failed login stops the whole run
+
+import smtplib
+import threading
+import queue
+import time
+from metrics import span, count
+
+# simple thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class SMTPPool:
+    def __init__(self, host, port, username=None, password=None, use_tls=True,
+                 workers=4, rate=None, max_retries=3, backoff=1.0, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.workers = workers
+        self.bucket = TokenBucket(rate) if rate else None
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+    # a connection whose STARTTLS or login fails is closed before the error is raised
+    def connect(self):
+        count('smtp_connections')
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    # sends one message on the worker's connection, reconnecting when the server dropped it;
+    # returns (connection, error) where error is None on success. Only transient errors are
+    # retried: a 5xx reply would be the same on every attempt, and SMTPAuthenticationError
+    # is raised to the worker, since every other message would fail the same way.
+    def _send_with_retry(self, server, msg):
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                count('smtp_retries')
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                if server is None:
+                    server = self.connect()
+                server.send_message(msg)
+                return server, None
+            # SMTPException is an OSError, so the SMTP replies are told apart first
+            except smtplib.SMTPAuthenticationError:
+                raise
+            except smtplib.SMTPRecipientsRefused as e:
+                return server, e  # retrying won't help a rejected address
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code >= 500:
+                    return server, e
+                error = e
+                if e.smtp_code == 421:
+                    server = None  # the server is closing the connection
+            except (smtplib.SMTPServerDisconnected, OSError) as e:
+                error = e
+                server = None
+        return server, error
+
+    # Any unexpected exception fails that one message (the connection, in an unknown
+    # state, is dropped) and an exception from on_result is only reported: a worker that
+    # died would leave send_all() blocked on the full jobs queue. After a failed login
+    # (`stop` set) the remaining queued messages are taken off the queue without sending.
+    def _worker(self, jobs, on_result, stats, stats_lock, stop):
+        server = None
+        while True:
+            item = jobs.get()
+            if item is None:
+                break
+            if stop.is_set():
+                continue
+            key, msg = item
+            try:
+                if self.bucket:
+                    self.bucket.acquire()
+                server, error = self._send_with_retry(server, msg)
+            except smtplib.SMTPAuthenticationError as e:
+                server, error = None, e
+                with stats_lock:
+                    stats['aborted'] = e
+                stop.set()
+            except Exception as e:
+                server, error = None, e
+            with stats_lock:
+                stats['sent' if error is None else 'failed'] += 1
+            count('emails_sent' if error is None else 'emails_failed')
+            if on_result:
+                try:
+                    on_result(key, msg, error)
+                except Exception as e:
+                    print(f"⚠️ Result handler failed for {key}: {e}")
+        if server is not None:
+            try:
+                server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+    # messages: iterable of (key, EmailMessage); on_result(key, msg, error) is called
+    # from worker threads after every message (error is None when it was sent).
+    # stats['aborted'] is the SMTPAuthenticationError that stopped the run early, else None;
+    # messages after it are neither sent nor reported.
+    def send_all(self, messages, on_result=None):
+        jobs = queue.Queue(maxsize=self.workers * 100)
+        stats = {'sent': 0, 'failed': 0, 'aborted': None}
+        stats_lock = threading.Lock()
+        stop = threading.Event()
+        threads = [threading.Thread(target=self._worker, args=(jobs, on_result, stats, stats_lock, stop),
+                                    daemon=True)
+                   for _ in range(self.workers)]
+
+        start = time.perf_counter()
+        with span('mail.send'):
+            for t in threads:
+                t.start()
+            for item in messages:
+                if stop.is_set():
+                    break
+                jobs.put(item)
+            for _ in threads:
+                jobs.put(None)
+            for t in threads:
+                t.join()
+
+        stats['elapsed'] = time.perf_counter() - start
+        stats['throughput'] = (stats['sent'] + stats['failed']) / stats['elapsed'] if stats['elapsed'] else 0.0
+        return stats
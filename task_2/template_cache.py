@@ -0,0 +1,126 @@
+#  Template handling shared by mailer.py and whatsapp_sender.py
+#    Template files are parsed once into subject + body
+#    Parsed templates are cached by path and modification time
+#    A whole recipient DataFrame is rendered in one batch
+
+import os
+import string
+import pandas as pd
+import email.policy
+from email.message import EmailMessage
+
+class CompiledTemplate:
+    def __init__(self, subject, body):
+        self.subject = subject
+        self.body = body
+        # literal text / field name pairs, e.g. [('Hi ', 'name'), (',\n\nThanks...', None)]
+        self.subject_parts = self._compile(subject)
+        self.body_parts = self._compile(body)
+
+    @staticmethod
+    def _compile(text):
+        parts = []
+        for literal, field, spec, conversion in string.Formatter().parse(text):
+            if spec or conversion:
+                raise ValueError(f"Unsupported placeholder format in template: {{{field}!{conversion}:{spec}}}")
+            parts.append((literal, field))
+        return parts
+
+    # renders one recipient, values is a dict like {'name': 'John'}
+    def render(self, **values):
+        return self._render_one(self.subject_parts, values), self._render_one(self.body_parts, values)
+
+    @staticmethod
+    def _render_one(parts, values):
+        return ''.join(literal + ('' if field is None else str(values[field])) for literal, field in parts)
+
+    # batch rendering: every row of df at once with column-wise string concatenation,
+    # returned as a Series aligned with df.index (the result and every column added to it
+    # are str dtype: with pandas 3, object + str raises on an empty frame)
+    def render_subjects(self, df, defaults=None):
+        return self._render_column(self.subject_parts, df, defaults or {})
+
+    def render_bodies(self, df, defaults=None):
+        return self._render_column(self.body_parts, df, defaults or {})
+
+    @staticmethod
+    def _render_column(parts, df, defaults):
+        rendered = pd.Series('', index=df.index, dtype=str)
+        for literal, field in parts:
+            if literal:
+                rendered = rendered + literal
+            if field is None:
+                continue
+            if field in df.columns:
+                values = df[field].astype(object).where(df[field].notna(), defaults.get(field, '')).astype(str)
+            elif field in defaults:
+                values = str(defaults[field])
+            else:
+                raise KeyError(f"Template placeholder '{{{field}}}' has no matching column")
+            rendered = rendered + values
+        return rendered
+
+    @property
+    def subject_is_static(self):
+        return all(field is None for _, field in self.subject_parts)
+
+# splits template text into subject and body: leading '#' comment lines are dropped,
+# a 'Subject: ...' line (if present) becomes the subject and the text after it the body
+def parse_template(text):
+    lines = text.splitlines()
+    while lines and (not lines[0].strip() or lines[0].lstrip().startswith('#')):
+        lines.pop(0)
+    subject = ''
+    if lines and lines[0].startswith('Subject:'):
+        subject = lines.pop(0)[len('Subject:'):].strip()
+        while lines and not lines[0].strip():
+            lines.pop(0)
+    return CompiledTemplate(subject, '\n'.join(lines))
+
+_template_cache = {}
+
+# returns the compiled template for a file, re-parsing only when the file changed
+def load_compiled_template(template_path):
+    path = os.path.abspath(template_path)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _template_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'r') as f:
+        compiled = parse_template(f.read())
+    _template_cache[path] = (mtime, compiled)
+    return compiled
+
+_text_template_cache = {}
+
+# same cache for templates given as plain text (e.g. the WhatsApp message)
+def compile_text_template(text):
+    compiled = _text_template_cache.get(text)
+    if compiled is None:
+        compiled = _text_template_cache[text] = CompiledTemplate('', text)
+    return compiled
+
+# yields (recipient, EmailMessage) for every row in df. Headers that are the same for
+# every message (From, and Subject when it has no placeholders) are parsed into header
+# objects once; EmailMessage reuses such objects as-is instead of re-parsing the value.
+def build_email_messages(template, df, sender_email, subject=None, defaults=None):
+    defaults = {'name': 'Customer', **(defaults or {})}
+    make_header = email.policy.default.header_factory
+    from_header = make_header('From', sender_email)
+
+    subjects = None
+    if subject is not None:
+        fixed_subject = make_header('Subject', subject)
+    elif template.subject_is_static:
+        fixed_subject = make_header('Subject', template.subject)
+    else:
+        subjects = template.render_subjects(df, defaults).tolist()
+    bodies = template.render_bodies(df, defaults).tolist()
+
+    for i, (recipient, body) in enumerate(zip(df['email'].tolist(), bodies)):
+        msg = EmailMessage()
+        msg.set_content(body)
+        msg['Subject'] = fixed_subject if subjects is None else subjects[i]
+        msg['From'] = from_header
+        msg['To'] = recipient
+        yield recipient, msg
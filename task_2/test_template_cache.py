@@ -0,0 +1,18 @@
+#  Tests for template_cache.py batch rendering (run with: python -m pytest task_2)
+
+import pandas as pd
+from template_cache import CompiledTemplate, build_email_messages
+
+def test_render_empty_frame():
+    template = CompiledTemplate('Hi {name}', 'Hello {name},\nthanks!')
+    for dtype in (object, str):
+        df = pd.DataFrame({'name': pd.Series([], dtype=dtype), 'email': pd.Series([], dtype=dtype)})
+        assert template.render_subjects(df, {'name': 'Customer'}).tolist() == []
+        assert template.render_bodies(df, {'name': 'Customer'}).tolist() == []
+        assert list(build_email_messages(template, df, 'me@example.com')) == []
+
+def test_render_matches_single_render():
+    template = CompiledTemplate('Hi {name}', 'Hello {name},\nthanks!')
+    df = pd.DataFrame({'name': ['Asha', None, 7]})
+    assert template.render_bodies(df, {'name': 'Customer'}).tolist() == [
+        template.render(name=name)[1] for name in ('Asha', 'Customer', 7)]
@@ -0,0 +1,75 @@
+#  Tests for the WhatsApp outbox (run with: python -m pytest task_2)
+
+import sqlite3
+import threading
+import pandas as pd
+from whatsapp_queue import FakeTransport, WhatsAppQueue
+from whatsapp_sender import send_whatsapp_messages
+
+TEMPLATE = "Hi {name}, thanks for connecting!"
+
+# stops the dispatch worker it runs in after `limit` messages, like a run cut short
+class StoppingTransport(FakeTransport):
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+
+    def send(self, phone, message):
+        super().send(phone, message)
+        if len(self.sent) >= self.limit:
+            threading.current_thread().stop()
+
+def write_contacts(csv_file, count=10):
+    phones = [f'+9170000000{i:02d}' for i in range(count)]
+    pd.DataFrame({'name': [f'Lead {i}' for i in range(count)], 'phone': phones,
+                  'phone_valid': True}).to_csv(csv_file, index=False)
+    return phones
+
+def test_resumed_campaign_reaches_each_contact_once(tmp_path):
+    csv_file, queue_db = tmp_path / 'contacts.csv', tmp_path / 'queue.db'
+    phones = write_contacts(csv_file)
+
+    first = StoppingTransport(limit=3)
+    send_whatsapp_messages(TEMPLATE, csv_file, queue_db, first).join()
+    # a message claimed by a run that crashed before sending it
+    queue = WhatsAppQueue(queue_db)
+    conn = queue._connect()
+    queue.claim_next(conn)
+    conn.close()
+
+    second, third = FakeTransport(), FakeTransport()
+    send_whatsapp_messages(TEMPLATE, csv_file, queue_db, second, resume=True).join()
+    send_whatsapp_messages(TEMPLATE, csv_file, queue_db, third, resume=True).join()
+
+    delivered = sorted(phone for phone, _ in first.sent + second.sent)
+    assert delivered == phones
+    assert third.sent == []
+    assert queue.status_counts() == {'sent': 10}
+
+def test_campaign_can_be_sent_again(tmp_path):
+    csv_file, queue_db = tmp_path / 'contacts.csv', tmp_path / 'queue.db'
+    phones = write_contacts(csv_file)
+    first, second = FakeTransport(), FakeTransport()
+    send_whatsapp_messages(TEMPLATE, csv_file, queue_db, first).join()
+    send_whatsapp_messages(TEMPLATE, csv_file, queue_db, second).join()
+    assert sorted(phone for phone, _ in second.sent) == phones
+    assert WhatsAppQueue(queue_db).status_counts() == {'sent': 20}
+
+# claim_next / mark_sent report 'database is locked' once each, as when another
+# process holds the write lock longer than the connection timeout
+def test_worker_waits_out_locked_database(tmp_path, monkeypatch):
+    csv_file, queue_db = tmp_path / 'contacts.csv', tmp_path / 'queue.db'
+    phones = write_contacts(csv_file, count=3)
+    for name in ('claim_next', 'mark_sent'):
+        original = getattr(WhatsAppQueue, name)
+        def locked_once(self, *args, original=original, calls=[]):
+            calls.append(1)
+            if len(calls) == 1:
+                raise sqlite3.OperationalError('database is locked')
+            return original(self, *args)
+        monkeypatch.setattr(WhatsAppQueue, name, locked_once)
+
+    transport = FakeTransport()
+    send_whatsapp_messages(TEMPLATE, csv_file, queue_db, transport).join()
+    assert sorted(phone for phone, _ in transport.sent) == phones
+    assert WhatsAppQueue(queue_db).status_counts() == {'sent': 3}
@@ -0,0 +1,197 @@
+#  Outbound WhatsApp queue used by whatsapp_sender.py
+#    Messages are stored in a SQLite table (whatsapp_outbox) with their status
+#    A background worker thread sends them through a pluggable transport
+#    Pacing adapts to the transport instead of sleeping a fixed 15 s per contact
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from metrics import count
+
+QUEUED, SENDING, SENT, FAILED = 'queued', 'sending', 'sent', 'failed'
+
+# real transport: pywhatkit opens WhatsApp Web and types the message.
+# pywhatkit is imported on first use because importing it starts browser tooling.
+class PyWhatKitTransport:
+    min_interval = 2.0    # seconds between messages when everything goes well
+    max_interval = 60.0   # upper bound after repeated failures
+
+    def __init__(self, wait_time=10, close_time=3):
+        self.wait_time = wait_time
+        self.close_time = close_time
+
+    def send(self, phone, message):
+        import pywhatkit as kit
+        kit.sendwhatmsg_instantly(phone_no=phone, message=message, wait_time=self.wait_time,
+                                  tab_close=True, close_time=self.close_time)
+
+# local stand-in for tests and dry runs: records messages instead of sending them,
+# optionally failing every Nth call
+class FakeTransport:
+    min_interval = 0.0
+    max_interval = 0.05
+
+    def __init__(self, latency=0.0, fail_every=0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.calls = 0
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def send(self, phone, message):
+        with self.lock:
+            self.calls += 1
+            fail = self.fail_every and self.calls % self.fail_every == 0
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise RuntimeError("fake transport failure")
+        with self.lock:
+            self.sent.append((phone, message))
+
+class WhatsAppQueue:
+    def __init__(self, db_path='whatsapp_queue.db'):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS whatsapp_outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    phone TEXT NOT NULL,
+                    name TEXT,
+                    message TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    sent_at TEXT
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_whatsapp_outbox_status ON whatsapp_outbox (status, id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_whatsapp_outbox_phone ON whatsapp_outbox (phone)')
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    # rows: iterable of (phone, name, message); returns how many were queued. A message
+    # still queued or being sent to that phone is not queued again. resume=True also skips
+    # messages already sent, so an interrupted campaign can be run again without anyone
+    # getting it twice; without it the campaign is sent again, as a new one.
+    def enqueue(self, rows, resume=False):
+        skip = (QUEUED, SENDING, SENT) if resume else (QUEUED, SENDING)
+        statuses = ', '.join(f"'{status}'" for status in skip)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                before = conn.total_changes
+                conn.executemany(f'''
+                    INSERT INTO whatsapp_outbox (phone, name, message)
+                    SELECT ?1, ?2, ?3 WHERE NOT EXISTS (
+                        SELECT 1 FROM whatsapp_outbox WHERE phone = ?1 AND message = ?3 AND status IN ({statuses}))
+                ''', rows)
+                return conn.total_changes - before
+        finally:
+            conn.close()
+
+    # messages left in 'sending' by a crashed or stopped run go back to the queue
+    def requeue_interrupted(self):
+        with self._connect() as conn:
+            return conn.execute("UPDATE whatsapp_outbox SET status = ? WHERE status = ?", (QUEUED, SENDING)).rowcount
+
+    # atomically takes the oldest queued message; returns (id, phone, name, message, attempts) or None
+    def claim_next(self, conn):
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT id, phone, name, message, attempts FROM whatsapp_outbox '
+                               'WHERE status = ? ORDER BY id LIMIT 1', (QUEUED,)).fetchone()
+            if row:
+                conn.execute('UPDATE whatsapp_outbox SET status = ?, attempts = attempts + 1 WHERE id = ?',
+                             (SENDING, row[0]))
+        return row
+
+    def mark_sent(self, conn, message_id):
+        with conn:
+            conn.execute('UPDATE whatsapp_outbox SET status = ?, sent_at = ?, last_error = NULL WHERE id = ?',
+                         (SENT, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), message_id))
+
+    def mark_failed(self, conn, message_id, error, retry):
+        with conn:
+            conn.execute('UPDATE whatsapp_outbox SET status = ?, last_error = ? WHERE id = ?',
+                         (QUEUED if retry else FAILED, str(error), message_id))
+
+    def status_counts(self):
+        with self._connect() as conn:
+            return dict(conn.execute('SELECT status, COUNT(*) FROM whatsapp_outbox GROUP BY status').fetchall())
+
+# Background sender. The gap between messages starts at the transport's min_interval,
+# doubles after every failure (up to max_interval) and shrinks back by a quarter after
+# every success, so the worker runs as fast as the transport actually allows.
+class DispatchWorker(threading.Thread):
+    def __init__(self, queue, transport, max_attempts=3, stop_when_empty=True, poll_interval=1.0, verbose=True):
+        super().__init__(name='whatsapp-dispatch')
+        self.queue = queue
+        self.transport = transport
+        self.max_attempts = max_attempts
+        self.stop_when_empty = stop_when_empty
+        self.poll_interval = poll_interval
+        self.verbose = verbose
+        self.interval = transport.min_interval
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    # runs a queue call, waiting out 'database is locked' (another process writing for
+    # longer than the connection timeout) with growing pauses, so the thread doesn't die
+    # with its message stuck in 'sending'. Returns None once stop() was called.
+    def _retry_locked(self, func, *args):
+        delay = 0.5
+        while True:
+            try:
+                return func(*args)
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                count('whatsapp_db_busy')
+                if self._stop_event.wait(delay):
+                    return None
+                delay = min(delay * 2, 30.0)
+
+    def run(self):
+        conn = self.queue._connect()
+        try:
+            while not self._stop_event.is_set():
+                item = self._retry_locked(self.queue.claim_next, conn)
+                if item is None:
+                    if self.stop_when_empty:
+                        break
+                    self._stop_event.wait(self.poll_interval)
+                    continue
+
+                message_id, phone, name, message, attempts = item
+                try:
+                    self.transport.send(phone, message)
+                    error = None
+                except Exception as e:
+                    error = e
+                if error is None:
+                    self._retry_locked(self.queue.mark_sent, conn, message_id)
+                    count('whatsapp_sent')
+                    self.interval = max(self.transport.min_interval, self.interval * 0.75)
+                    if self.verbose:
+                        print(f"📲 Sent WhatsApp to {name} ({phone})")
+                else:
+                    retry = attempts + 1 < self.max_attempts
+                    self._retry_locked(self.queue.mark_failed, conn, message_id, error, retry)
+                    count('whatsapp_retries' if retry else 'whatsapp_failed')
+                    self.interval = min(self.transport.max_interval, max(self.interval * 2, 1.0))
+                    if self.verbose:
+                        print(f"❌ Failed to send to {phone}: {error}" + (" (will retry)" if retry else ""))
+
+                if self.interval:
+                    self._stop_event.wait(self.interval)
+        finally:
+            conn.close()
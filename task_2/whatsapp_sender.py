@@ -4,24 +4,44 @@
 
 
 import pandas as pd
-import pywhatkit as kit
-import time
+from template_cache import compile_text_template
+from whatsapp_queue import WhatsAppQueue, DispatchWorker, PyWhatKitTransport
+from metrics import span, count
 
-def send_whatsapp_messages(template_text, csv_file='clean_customers.csv'):
-    df = pd.read_csv(csv_file)
+# Queues a message for every contact with a valid phone and hands them to a background
+# worker, so this returns right away. The worker thread keeps the script alive until the
+# queue is drained; unsent messages stay in whatsapp_queue.db and are picked up next run.
+# resume=True skips contacts that already got this message (see WhatsAppQueue.enqueue).
+def send_whatsapp_messages(template_text, csv_file='clean_customers.csv', queue_db='whatsapp_queue.db',
+                           transport=None, resume=False):
+    # phones stay text ('+91...' would otherwise be read as a number)
+    with span('whatsapp.read'):
+        df = pd.read_csv(csv_file, dtype={'phone': str})
+    if 'phone_valid' in df.columns:
+        # clean_leads.py already normalized phones to E.164 and flagged bad ones
+        sendable = df['phone_valid'].astype(str).str.lower() == 'true'
+    else:
+        sendable = df['phone'].astype('string').str.startswith('+').fillna(False).astype(bool)
+    skipped = int((~sendable).sum())
+    df = df[sendable]
+    if skipped:
+        print(f"❌ Skipping {skipped} contacts without a valid phone")
+        count('whatsapp_skipped_phone', skipped)
 
-    for index, row in df.iterrows():
-        phone = row.get('phone')  # Ensure 'phone' column exists with country code
-        name = row.get('name', 'Customer')
-        message = template_text.format(name=name)
+    # messages for every contact are rendered in one batch from the cached template
+    with span('whatsapp.render'):
+        messages = compile_text_template(template_text).render_bodies(df, {'name': 'Customer'})
+        names = df['name'] if 'name' in df.columns else pd.Series('Customer', index=df.index)
+        rows = list(zip(df['phone'].tolist(), names.fillna('Customer').tolist(), messages.tolist()))
 
-        if pd.isna(phone) or not str(phone).startswith('+'):
-            print(f"❌ Skipping invalid phone: {phone}")
-            continue
-
-        try:
-            print(f"📲 Sending to {name} ({phone})...")
-            kit.sendwhatmsg_instantly(phone_no=phone, message=message, wait_time=10, tab_close=True)
-            time.sleep(15)  # Delay between messages
-        except Exception as e:
-            print(f"❌ Failed to send to {phone}: {e}")
+    with span('whatsapp.enqueue'):
+        queue = WhatsAppQueue(queue_db)
+        queue.requeue_interrupted()
+        queued = queue.enqueue(rows, resume=resume)
+    count('whatsapp_queued', queued)
+    worker = DispatchWorker(queue, transport or PyWhatKitTransport())
+    worker.start()
+    if queued < len(rows):
+        print(f"⏭️ {len(rows) - queued} messages were already queued" + (" or sent" if resume else ""))
+    print(f"📥 Queued {queued} messages; sending in the background ({queue.status_counts()})")
+    return worker
@@ -0,0 +1,86 @@
+#  Content-addressed cache for rendered report files (charts, PDF, workbook).
+#    An artifact's key is a hash of everything it is drawn from: the aggregated
+#    DataFrames, the options and the renderer's RENDERER_VERSION
+#    The rendered file is kept as .report_cache/<key>.<ext> next to the output
+#    On a hit the kept file is copied back (nothing happens when the output already is
+#    that copy); on a miss the file is rendered and then kept
+#  Bump RENDERER_VERSION in visualizer.py / exporter.py when a change alters their output.
+
+import os
+import hashlib
+import filecmp
+import shutil
+import pandas as pd
+from metrics import span, count
+
+ARTIFACT_DIR = '.report_cache'
+MAX_ARTIFACTS = 64  # the oldest files are removed past this
+
+# hex digest of DataFrames / Series (values, column names and dtypes), bytes and reprs of anything else
+def input_digest(*parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            frame = part.to_frame() if isinstance(part, pd.Series) else part
+            h.update(repr([(str(c), str(t)) for c, t in frame.dtypes.items()]).encode('utf-8'))
+            h.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+        elif isinstance(part, bytes):
+            h.update(part)
+        else:
+            h.update(repr(part).encode('utf-8'))
+        h.update(b'\x00')
+    return h.hexdigest()
+
+# digest of a file's contents, None when it doesn't exist (e.g. a chart that failed)
+def file_digest(path):
+    if not os.path.exists(path):
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def _stored_path(output_file, key):
+    folder = os.path.join(os.path.dirname(os.path.abspath(output_file)), ARTIFACT_DIR)
+    return os.path.join(folder, key + os.path.splitext(output_file)[1])
+
+# copies through a temporary file so readers never see half a file; copy2 keeps the
+# mtime, so the next filecmp only compares os.stat() signatures
+def _copy_atomic(src, dst):
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+# puts the artifact stored under `key` at output_file; False when there is none
+def restore_artifact(output_file, key):
+    stored = _stored_path(output_file, key)
+    if not os.path.exists(stored):
+        return False
+    if not (os.path.exists(output_file) and filecmp.cmp(stored, output_file, shallow=True)):
+        _copy_atomic(stored, output_file)
+    return True
+
+# keeps a copy of a freshly rendered output_file under `key`
+def store_artifact(output_file, key):
+    stored = _stored_path(output_file, key)
+    folder = os.path.dirname(stored)
+    os.makedirs(folder, exist_ok=True)
+    _copy_atomic(output_file, stored)
+    kept = sorted((entry for entry in os.scandir(folder) if entry.is_file()), key=lambda e: e.stat().st_mtime_ns)
+    for entry in kept[:-MAX_ARTIFACTS]:
+        os.remove(entry.path)
+
+# render(path) writes the artifact; it is only called when nothing is stored under `key`.
+# Returns True when the cached file was reused. enabled=False always renders.
+# Every render is timed as the span 'render.<file name>'.
+def cached_artifact(output_file, key, render, enabled=True):
+    if enabled and restore_artifact(output_file, key):
+        count('artifact_cache_hits')
+        return True
+    with span(f"render.{os.path.basename(output_file)}"):
+        render(output_file)
+    if enabled:
+        count('artifact_cache_misses')
+        store_artifact(output_file, key)
+    return False
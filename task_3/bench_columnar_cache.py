@@ -0,0 +1,57 @@
+#  Benchmark: parsing sales_data-style CSVs on every run vs the Parquet cache.
+#  Usage: python bench_columnar_cache.py [--rows 1000000 5000000]
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from date_parsing import parse_dates
+from columnar_cache import read_csv_cached, CACHE_DIR
+
+def write_sales_csv(path, rows, seed=5):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 730, rows), unit='D')
+    pd.DataFrame({
+        'customer': np.char.add('Customer ', rng.integers(0, 50_000, rows).astype(str)),
+        'amount': rng.uniform(100, 50_000, rows).round(2),
+        'date': dates.strftime('%Y-%m-%d'),
+        'notes': 'imported from CRM export',
+    }).to_csv(path, index=False)
+
+def time_it(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+# the old path: read everything as text, then parse dates
+def read_csv_every_time(path):
+    df = pd.read_csv(path)
+    df['date'], _ = parse_dates(df['date'])
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description="Parquet cache benchmark")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 5_000_000])
+    args = parser.parse_args()
+
+    columns = ['customer', 'amount', 'date']
+    print(f"{'Rows':>12}{'CSV MB':>9}{'CSV read s':>12}{'First cached s':>16}{'Cached read s':>15}")
+    tmp = tempfile.mkdtemp()
+    try:
+        for rows in args.rows:
+            path = os.path.join(tmp, 'sales_data.csv')
+            write_sales_csv(path, rows)
+            shutil.rmtree(os.path.join(tmp, CACHE_DIR), ignore_errors=True)
+            csv_s = time_it(lambda: read_csv_every_time(path))
+            read = lambda: read_csv_cached(path, columns=columns, numeric_columns=('amount',))
+            first_s = time_it(read)
+            cached_s = min(time_it(read) for _ in range(3))
+            print(f"{rows:>12,}{os.path.getsize(path) / 2**20:>9.0f}{csv_s:>12.2f}{first_s:>16.2f}{cached_s:>15.3f}")
+    finally:
+        shutil.rmtree(tmp)
+
+if __name__ == "__main__":
+    main()
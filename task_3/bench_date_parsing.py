@@ -0,0 +1,45 @@
+#  Benchmark: pd.to_datetime(errors='coerce') + strftime('%Y-W%U') (old path)
+#  vs parse_dates() + integer week codes from date_parsing.py.
+#  Usage: python bench_date_parsing.py [--rows 1000000 5000000] [--format %d/%m/%Y]
+
+import argparse
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from date_parsing import parse_dates, week_codes, week_labels
+
+def make_dates(rows, fmt, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 730, rows), unit='D')
+    values = pd.Series(dates.strftime(fmt))
+    values[::1000] = 'not a date'
+    return values
+
+def time_it(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Date parsing benchmark")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 5_000_000])
+    parser.add_argument('--format', default='%d/%m/%Y', help="layout of the generated date strings")
+    args = parser.parse_args()
+
+    print(f"{'Rows':>12}{'Old parse s':>13}{'New parse s':>13}{'Old weeks s':>13}{'New weeks s':>13}{'NaT':>8}")
+    for rows in args.rows:
+        values = make_dates(rows, args.format)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # the old path warns that it can't infer one format
+            old_parse, old = time_it(lambda: pd.to_datetime(values, errors='coerce', dayfirst=True).dropna())
+        new_parse, (new, bad) = time_it(lambda: parse_dates(values))
+        new = new.dropna()
+        old_weeks, old_counts = time_it(lambda: old.groupby(old.dt.strftime('%Y-W%U')).size())
+        new_weeks, new_counts = time_it(lambda: week_codes(new).value_counts().sort_index())
+        assert old_counts.tolist() == new_counts.tolist()
+        assert old_counts.index.tolist() == week_labels(new_counts.index).tolist()
+        print(f"{rows:>12,}{old_parse:>13.2f}{new_parse:>13.2f}{old_weeks:>13.2f}{new_weeks:>13.2f}{bad:>8,}")
+
+if __name__ == "__main__":
+    main()
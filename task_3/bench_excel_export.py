@@ -0,0 +1,64 @@
+#  Benchmark: pd.ExcelWriter (old path) vs streaming write_excel() engines.
+#  Every run happens in a fresh subprocess so peak RSS is measured per writer.
+#  Usage: python bench_excel_export.py [--rows 100000 500000] [--engines pandas xlsxwriter openpyxl]
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+def make_sales(rows, seed=7):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 730, rows), unit='D')
+    return pd.DataFrame({
+        'customer': np.char.add('Customer ', rng.integers(0, 50_000, rows).astype(str)),
+        'amount': rng.uniform(100, 50_000, rows).round(2),
+        'date': dates,
+    })
+
+# child process: build the data, write it once, report seconds and peak RSS as JSON
+def run_one(engine, rows):
+    from excel_writer import write_excel
+    df = make_sales(rows)
+    monthly = df.groupby(df['date'].dt.to_period('M'))['amount'].sum().reset_index()
+    top = df.groupby('customer')['amount'].sum().nlargest(5).reset_index()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        write_excel(os.path.join(tmp, 'report.xlsx'),
+                    [('MonthlyTrend', monthly), ('TopCustomers', top), ('AllSales', df)], engine=engine)
+        seconds = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'seconds': seconds, 'peak_rss_mb': peak / 1024, 'writer_rss_mb': (peak - baseline) / 1024}))
+
+def main():
+    parser = argparse.ArgumentParser(description="Excel export benchmark")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 500_000])
+    parser.add_argument('--engines', nargs='+', default=['pandas', 'xlsxwriter', 'openpyxl'])
+    parser.add_argument('--child', nargs=2, metavar=('ENGINE', 'ROWS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_one(args.child[0], int(args.child[1]))
+        return
+
+    print(f"{'Rows':>10}  {'Engine':<12}{'Seconds':>10}{'Peak RSS MB':>14}{'Writer +MB':>12}")
+    for rows in args.rows:
+        for engine in args.engines:
+            out = subprocess.run([sys.executable, __file__, '--child', engine, str(rows)],
+                                 capture_output=True, text=True, check=True,
+                                 cwd=os.path.dirname(os.path.abspath(__file__)))
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{rows:>10,}  {engine:<12}{result['seconds']:>10.2f}"
+                  f"{result['peak_rss_mb']:>14.0f}{result['writer_rss_mb']:>12.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#  Parquet working copy of CSV inputs (task_1/columnar_cache.py loads this file).
+#    The first read parses the CSV once, types the date/number columns and saves the
+#    result as Parquet in a .csv_cache folder next to the CSV
+#    Later reads load the Parquet file (only the requested columns) for as long as the
+#    CSV's size and modification time are unchanged
+#    How many dates could not be parsed is kept with the cache (see bad_date_count)
+#    Without pyarrow everything falls back to reading the CSV directly
+
+import os
+import json
+import hashlib
+import importlib.util
+import pandas as pd
+from date_parsing import parse_dates
+
+CACHE_DIR = '.csv_cache'
+CACHE_VERSION = 3  # part of the cache key; bump when the cached contents change
+
+def _parquet_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+# one cache file per CSV and set of read options, e.g. .csv_cache/sales_data.1f2e3d4c.parquet
+def cache_path(csv_file, options):
+    key = hashlib.blake2b(json.dumps(options, sort_keys=True).encode('utf-8'), digest_size=4).hexdigest()
+    name = os.path.splitext(os.path.basename(csv_file))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(csv_file)), CACHE_DIR, f"{name}.{key}.parquet")
+
+def _source_stamp(csv_file):
+    st = os.stat(csv_file)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+# (csv_source stamp, bad date counts) recorded in a cache file
+def _cached_metadata(path):
+    import pyarrow.parquet as pq
+    metadata = pq.read_schema(path).metadata or {}
+    stamp, bad_dates = metadata.get(b'csv_source'), metadata.get(b'bad_dates')
+    return json.loads(stamp) if stamp else None, json.loads(bad_dates) if bad_dates else {}
+
+# number of non-empty values in a date column of a read_csv_cached() result that could
+# not be parsed and are missing dates now; the same whether the CSV was parsed on this
+# read or earlier, when the cache was built. `column` is matched after strip().lower().
+def bad_date_count(df, column='date'):
+    return df.attrs.get('bad_dates', {}).get(column, 0)
+
+# CSV -> typed DataFrame. Column names are matched after strip().lower(), so ' Date' is
+# typed as 'date', but the names themselves are left as they are in the file.
+def _read_and_type(csv_file, date_columns, numeric_columns, date_format, read_csv_kwargs):
+    df = pd.read_csv(csv_file, **read_csv_kwargs)
+    bad_dates = {}
+    for col in df.columns:
+        key = str(col).strip().lower()
+        if key in date_columns:
+            df[col], bad_dates[key] = parse_dates(df[col], date_format)
+        elif key in numeric_columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    df.attrs['bad_dates'] = bad_dates
+    return df
+
+def _select(df, columns, bad_dates):
+    if columns is not None:
+        df = df[list(columns)]
+    df.attrs['bad_dates'] = bad_dates
+    return df
+
+# Reads `csv_file` through the Parquet cache and returns only `columns` (all when None).
+#   date_columns / numeric_columns: columns stored as datetime / numbers (unparseable -> NaT / NaN)
+#   read_csv_kwargs: passed to pd.read_csv when the CSV has to be parsed (e.g. dtype=str)
+# The cache is rebuilt whenever the CSV's size or mtime differ from the ones recorded in it.
+# Raises FileNotFoundError like pd.read_csv when the CSV doesn't exist.
+def read_csv_cached(csv_file, columns=None, date_columns=('date',), numeric_columns=(), date_format=None,
+                    **read_csv_kwargs):
+    if not os.path.exists(csv_file):
+        raise FileNotFoundError(csv_file)
+    date_columns = tuple(c.lower() for c in date_columns)
+    numeric_columns = tuple(c.lower() for c in numeric_columns)
+
+    if not _parquet_available():
+        df = _read_and_type(csv_file, date_columns, numeric_columns, date_format, read_csv_kwargs)
+        return _select(df, columns, df.attrs['bad_dates'])
+
+    options = {'version': CACHE_VERSION, 'dates': date_columns, 'numbers': numeric_columns, 'format': date_format,
+               'read_csv': {k: str(v) for k, v in read_csv_kwargs.items()}}
+    path = cache_path(csv_file, options)
+    stamp = _source_stamp(csv_file)
+    if os.path.exists(path):
+        cached_stamp, bad_dates = _cached_metadata(path)
+        if cached_stamp == stamp:
+            return _select(pd.read_parquet(path, columns=None if columns is None else list(columns)),
+                           None, bad_dates)
+
+    df = _read_and_type(csv_file, date_columns, numeric_columns, date_format, read_csv_kwargs)
+    try:
+        _write_cache(df, path, stamp)
+    except (ValueError, TypeError, OSError) as e:  # e.g. a column mixing numbers and text
+        print(f"⚠️ Could not cache '{csv_file}' as Parquet: {e}")
+    return _select(df, columns, df.attrs['bad_dates'])
+
+# written to a temporary file first so a crash never leaves a half-written cache behind
+def _write_cache(df, path, stamp):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           b'csv_source': json.dumps(stamp).encode('utf-8'),
+                                           b'bad_dates': json.dumps(df.attrs['bad_dates']).encode('utf-8')})
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
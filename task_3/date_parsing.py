@@ -0,0 +1,76 @@
+#  Date handling shared by the sales analyzer and the lead report
+#  (task_1/date_parsing.py loads this file).
+#    Dates are parsed with one explicit format instead of per-value inference;
+#    the format is detected once from a sample when it isn't given
+#    Repeated values are converted once (cache=True)
+#    Weeks are grouped by integer codes, only the final labels are formatted
+
+import numpy as np
+import pandas as pd
+
+# tried in this order by detect_date_format(); the first one wins a tie, so month-first
+# layouts come before day-first ones: '03/04/2025' is 4 March, as pd.to_datetime reads it
+COMMON_DATE_FORMATS = [
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y/%m/%d',
+    '%m/%d/%Y', '%m-%d-%Y',
+    '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y',
+    '%d %b %Y', '%b %d, %Y',
+]
+
+# picks the format from COMMON_DATE_FORMATS that parses the most values of a sample of
+# distinct non-empty dates; returns None when no format parses any of them. Values in
+# another layout then become NaT and show up in parse_dates()' count. When another
+# format parses the sample just as well (every day is 12 or less) a warning says which
+# one was picked.
+def detect_date_format(values, sample_size=1000):
+    sample = pd.Series(values).dropna().astype(str).str.strip()
+    sample = sample[sample != ''].drop_duplicates().head(sample_size)
+    if sample.empty:
+        return None
+    best, best_parsed, tied = None, 0, []
+    for fmt in COMMON_DATE_FORMATS:
+        parsed = pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+        if parsed > best_parsed:
+            best, best_parsed, tied = fmt, parsed, []
+        elif parsed and parsed == best_parsed:
+            tied.append(fmt)
+    if tied:
+        print(f"⚠️ Dates such as '{sample.iloc[0]}' fit both {best} and {tied[0]}; using {best} "
+              f"(pass date_format to choose)")
+    return best
+
+# Parses a column of dates; returns (datetime Series, number of non-empty values that
+# could not be parsed and became NaT). Columns that already hold datetimes are returned
+# as they are. Without a usable format pandas' own inference is the fallback.
+# Every distinct string is converted once and the results are spread back over the rows;
+# dates repeat a lot (a few thousand days for millions of rows), so this is the big win.
+# cache=True does the same inside pandas, but in practice its heuristics often skip it.
+def parse_dates(values, date_format=None):
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values, 0
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques).astype(str).str.strip()
+    date_format = date_format or detect_date_format(uniques)
+    if date_format:
+        parsed = pd.to_datetime(uniques, format=date_format, errors='coerce', cache=True)
+    else:
+        parsed = pd.to_datetime(uniques, errors='coerce', cache=True)
+    failed = (parsed.isna() & (uniques != '')).to_numpy()
+    coerced = int(np.bincount(codes[codes >= 0], minlength=len(uniques))[failed].sum())
+    dates = pd.DatetimeIndex(parsed).take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(dates, index=values.index, name=values.name), coerced
+
+# Week number as in strftime('%U') (weeks start on Sunday; days before the first
+# Sunday are week 00), encoded as the integer year * 100 + week, e.g. 202514.
+# `dates` must not contain NaT.
+def week_codes(dates):
+    day_of_year = dates.dt.dayofyear.to_numpy() - 1
+    weekday_from_sunday = (dates.dt.dayofweek.to_numpy() + 1) % 7
+    week = (day_of_year + 7 - weekday_from_sunday) // 7
+    return pd.Series(dates.dt.year.to_numpy() * 100 + week, index=dates.index, dtype=np.int64)
+
+# 202514 -> '2025-W14', the label strftime('%Y-W%U') would give
+def week_labels(codes):
+    codes = pd.Series(codes)
+    return codes.floordiv(100).astype(str) + '-W' + codes.mod(100).astype(str).str.zfill(2)
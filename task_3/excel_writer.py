@@ -0,0 +1,89 @@
+#  Streaming Excel writer used by exporter.py and task_1/generate_report.py
+#  (task_1/excel_writer.py loads this file).
+#    Rows are converted and written in chunks, so memory stays flat however long the sheet
+#    Sheets longer than Excel's row limit continue on extra worksheets
+
+import os
+import itertools
+import pandas as pd
+
+EXCEL_MAX_ROWS = 1_048_576  # rows per worksheet, header included
+EXCEL_CHUNK_ROWS = 50_000   # rows converted to Python values at a time
+
+# picks the streaming writer: xlsxwriter (constant_memory) when installed, else openpyxl write-only
+def _resolve_excel_engine(engine):
+    if engine != 'auto':
+        return engine
+    try:
+        import xlsxwriter  # noqa: F401
+        return 'xlsxwriter'
+    except ImportError:
+        return 'openpyxl'
+
+# yields lists of plain Python rows for a DataFrame, EXCEL_CHUNK_ROWS at a time
+def _iter_excel_rows(df):
+    for start in range(0, len(df), EXCEL_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXCEL_CHUNK_ROWS].copy()
+        for col in chunk.columns:
+            if isinstance(chunk[col].dtype, pd.PeriodDtype):
+                chunk[col] = chunk[col].astype(str)
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        yield chunk.values.tolist()
+
+# sheet names for a DataFrame split over as many worksheets as Excel's row limit needs
+def _split_sheet_names(sheet_name, rows):
+    parts = max(1, -(-rows // (EXCEL_MAX_ROWS - 1)))
+    return [sheet_name if i == 0 else f"{sheet_name[:28]}_{i + 1}" for i in range(parts)]
+
+# Writes several DataFrames into one workbook with a constant-memory streaming writer.
+#   sheets:  list of (sheet_name, DataFrame)
+#   engine:  'auto', 'xlsxwriter', 'openpyxl' (both streaming) or 'pandas' (old pd.ExcelWriter path)
+#   sidecar: sheet names whose raw data goes to a '<output>_<sheet>.csv' / '.parquet' file
+#            next to the workbook instead of into it, with sidecar_format 'csv' or 'parquet'
+# Sheets longer than Excel's 1,048,576-row limit continue on '<name>_2', '<name>_3', ...
+def write_excel(output_file, sheets, engine='auto', sidecar=(), sidecar_format='csv'):
+    engine = _resolve_excel_engine(engine)
+    base = os.path.splitext(output_file)[0]
+    book_sheets = []
+    for sheet_name, df in sheets:
+        if sheet_name in sidecar:
+            path = f"{base}_{sheet_name}.{sidecar_format}"
+            if sidecar_format == 'parquet':
+                df.to_parquet(path, index=False)
+            else:
+                df.to_csv(path, index=False)
+            print(f"📄 Raw data for '{sheet_name}' saved as '{path}'")
+        else:
+            book_sheets.append((sheet_name, df))
+
+    if engine == 'pandas':
+        with pd.ExcelWriter(output_file) as writer:
+            for sheet_name, df in book_sheets:
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+        return
+
+    if engine == 'xlsxwriter':
+        import xlsxwriter
+        workbook = xlsxwriter.Workbook(output_file, {'constant_memory': True,
+                                                     'default_date_format': 'yyyy-mm-dd'})
+        add_sheet = workbook.add_worksheet
+        write_row = lambda sheet, r, row: sheet.write_row(r, 0, row)
+    else:
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        add_sheet = workbook.create_sheet
+        write_row = lambda sheet, r, row: sheet.append(row)
+
+    # rows must be written strictly in order: both writers only keep the current row in memory
+    for sheet_name, df in book_sheets:
+        rows = (row for chunk in _iter_excel_rows(df) for row in chunk)
+        for name in _split_sheet_names(sheet_name, len(df)):
+            sheet = add_sheet(name)
+            write_row(sheet, 0, [str(c) for c in df.columns])
+            for r, row in enumerate(itertools.islice(rows, EXCEL_MAX_ROWS - 1), start=1):
+                write_row(sheet, r, row)
+
+    if engine == 'xlsxwriter':
+        workbook.close()
+    else:
+        workbook.save(output_file)
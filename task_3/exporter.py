@@ -1,22 +1,119 @@
 # 3.Export reports to Excel & PDF format.
 
+import os
+import importlib.util
 from fpdf import FPDF
+from artifact_cache import input_digest, file_digest, cached_artifact
+from excel_writer import write_excel
 
-def export_to_pdf(total_revenue, monthly_df, top_customers_df, output_file='sales_report.pdf'):
+RENDERER_VERSION = 1  # part of the cache key of both reports (see artifact_cache.py)
+
+# raw_df=None (streaming analysis) leaves out the AllSales sheet. The workbook is reused from
+# the artifact cache when the same data was exported before (not with sidecar files, which
+# would not be restored).
+def export_to_excel(monthly_df, top_customers_df, raw_df, output_file='sales_report.xlsx',
+                    engine='auto', sidecar=(), sidecar_format='csv', cache=True):
+    sheets = [('MonthlyTrend', monthly_df), ('TopCustomers', top_customers_df)]
+    if raw_df is not None:
+        sheets.append(('AllSales', raw_df))
+    key = input_digest('excel', RENDERER_VERSION, engine, *[part for sheet in sheets for part in sheet])
+    render = lambda path: write_excel(path, sheets, engine=engine, sidecar=sidecar, sidecar_format=sidecar_format)
+    if cached_artifact(output_file, key, render, enabled=cache and not sidecar):
+        print(f"♻️ Excel report '{output_file}' is up to date (sales unchanged)")
+    else:
+        print(f"📊 Excel report saved as '{output_file}'")
+
+# Unicode TTF fonts that can print the ₹ sign, first match wins. REPORT_FONT overrides;
+# DejaVuSans ships with matplotlib, which the charts already need.
+def _unicode_font_candidates():
+    if os.environ.get('REPORT_FONT'):
+        yield os.environ['REPORT_FONT']
+    yield '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+    yield '/usr/share/fonts/dejavu/DejaVuSans.ttf'
+    yield '/Library/Fonts/Arial Unicode.ttf'
+    yield 'C:\\Windows\\Fonts\\arial.ttf'
+    spec = importlib.util.find_spec('matplotlib')
+    if spec and spec.submodule_search_locations:
+        for location in spec.submodule_search_locations:
+            yield os.path.join(location, 'mpl-data', 'fonts', 'ttf', 'DejaVuSans.ttf')
+
+_report_font = None
+
+# Returns (pdf, font family, currency symbol) for a new report. The font lookup runs once
+# per process. fpdf2 subsets the parsed TTF in place when writing a document, so the
+# parsed font itself cannot be shared between reports. Without a Unicode font the core
+# Helvetica font is used and amounts are prefixed with 'Rs.' instead of '₹'.
+def _new_report_pdf():
+    global _report_font
+    if _report_font is None:
+        _report_font = next((path for path in _unicode_font_candidates() if os.path.exists(path)), '')
     pdf = FPDF()
+    if not _report_font:
+        return pdf, 'Helvetica', 'Rs.'
+    pdf.add_font('ReportFont', '', _report_font)
+    return pdf, 'ReportFont', '₹'
+
+# draws a bordered table from column lists of already formatted strings;
+# the header row is repeated at the top of every new page
+def _pdf_table(pdf, headers, columns, widths, row_height=8):
+    def header_row():
+        pdf.set_fill_color(220, 230, 241)
+        for text, width in zip(headers, widths):
+            pdf.cell(width, row_height, text, border=1, fill=True)
+        pdf.ln(row_height)
+
+    header_row()
+    for row in zip(*columns):
+        if pdf.get_y() + row_height > pdf.page_break_trigger:
+            pdf.add_page()
+            header_row()
+        for text, width in zip(row, widths):
+            pdf.cell(width, row_height, text, border=1)
+        pdf.ln(row_height)
+    pdf.ln(4)
+
+# the cache key includes the chart files' contents, since they are embedded
+def export_to_pdf(total_revenue, monthly_df, top_customers_df, output_file='sales_report.pdf',
+                  top_n=5, charts=('monthly_trend.png', 'top_customers.png'), cache=True):
+    key = input_digest('pdf', RENDERER_VERSION, total_revenue, top_n, monthly_df, top_customers_df,
+                       [file_digest(chart) for chart in charts or ()])
+    render = lambda path: _write_pdf(path, total_revenue, monthly_df, top_customers_df, top_n, charts)
+    if cached_artifact(output_file, key, render, enabled=cache):
+        print(f"♻️ PDF report '{output_file}' is up to date (sales unchanged)")
+    else:
+        print(f"📄 PDF report saved as '{output_file}'")
+
+def _write_pdf(output_file, total_revenue, monthly_df, top_customers_df, top_n, charts):
+    pdf, family, currency = _new_report_pdf()
     pdf.add_page()
-    pdf.set_font("Arial", size=12)
+    page_width = pdf.w - pdf.l_margin - pdf.r_margin
+
+    pdf.set_font(family, size=16)
+    pdf.cell(page_width, 12, "Sales Report", align='C')
+    pdf.ln(12)
+    pdf.set_font(family, size=12)
+    pdf.cell(page_width, 10, f"Total Revenue: {currency}{total_revenue:,.2f}")
+    pdf.ln(12)
+
+    def money(values):
+        return [f"{currency}{value:,.2f}" for value in values]
 
-    pdf.cell(200, 10, txt="📊 Sales Report", ln=True, align='C')
-    pdf.cell(200, 10, txt=f"Total Revenue: ₹{total_revenue:,.2f}", ln=True)
+    pdf.cell(page_width, 10, "Monthly Revenue Trend:")
+    pdf.ln(10)
+    _pdf_table(pdf, ['Month', 'Revenue'],
+               [monthly_df['month'].astype(str).tolist(), money(monthly_df['amount'].tolist())],
+               [page_width / 2, page_width / 2])
 
-    pdf.cell(200, 10, txt="Monthly Revenue Trend:", ln=True)
-    for _, row in monthly_df.iterrows():
-        pdf.cell(200, 10, txt=f"{row['month']}: ₹{row['amount']:,.2f}", ln=True)
+    top = top_customers_df.head(top_n)
+    pdf.cell(page_width, 10, f"Top {top_n} Customers:")
+    pdf.ln(10)
+    _pdf_table(pdf, ['Customer', 'Revenue'],
+               [top['customer'].astype(str).tolist(), money(top['amount'].tolist())],
+               [page_width * 0.6, page_width * 0.4])
 
-    pdf.cell(200, 10, txt="Top 5 Customers:", ln=True)
-    for _, row in top_customers_df.iterrows():
-        pdf.cell(200, 10, txt=f"{row['customer']}: ₹{row['amount']:,.2f}", ln=True)
+    # charts are rendered by visualizer.py beforehand; missing files are skipped
+    for chart in charts or ():
+        if os.path.exists(chart):
+            pdf.image(chart, w=page_width)
 
     pdf.output(output_file)
-    print(f"📄 PDF report saved as '{output_file}'")
@@ -9,16 +9,44 @@
 #  2.Use Matplotlib to visualize sales trends (bar chart & line graph).
 #  3.Export reports to Excel & PDF format
 
+import argparse
+import metrics
 from sales_analyzer import analyze_sales
+from streaming_sales import analyze_sales_streaming
 from visualizer import plot_monthly_trend, plot_top_customers
 from exporter import export_to_excel, export_to_pdf
 
 def main():
-    total, monthly, top, raw = analyze_sales()
-    plot_monthly_trend(monthly)
-    plot_top_customers(top)
-    export_to_excel(monthly, top, raw)
-    export_to_pdf(total, monthly, top)
+    parser = argparse.ArgumentParser(description="Sales analysis and reports")
+    parser.add_argument('--input', default='sales_data.csv', help="sales CSV (- for stdin with --streaming)")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Analyze in one pass with constant memory (no AllSales sheet)")
+    parser.add_argument('--max-customers', type=int, default=100_000,
+                        help="With --streaming: customers tracked exactly before switching to estimates")
+    parser.add_argument('--no-cache', action='store_true', help="Redraw charts and reports even if sales are unchanged")
+    parser.add_argument('--metrics', type=str,
+                        help="Record stage timings and counters to this file (.prom: Prometheus text, else JSON lines)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Run each step under cProfile and tracemalloc and print the hot spots")
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+    call = metrics.profile if args.profile else lambda func, *a, **kw: func(*a, **kw)
+
+    if args.streaming:
+        result = call(analyze_sales_streaming, args.input, max_customers=args.max_customers)
+    else:
+        result = call(analyze_sales, args.input)
+    if result is not None:
+        total, monthly, top, raw = result
+        cache = not args.no_cache
+        call(plot_monthly_trend, monthly, cache=cache)
+        call(plot_top_customers, top, cache=cache)
+        call(export_to_excel, monthly, top, raw, cache=cache)
+        call(export_to_pdf, total, monthly, top, cache=cache)
+
+    if args.metrics:
+        metrics.write_metrics(args.metrics, run='task_3')
 
 if __name__ == "__main__":
     main()
@@ -3,28 +3,38 @@
 #    Monthly revenue trend
 #    Top 5 customers
 
-import pandas as pd
+from columnar_cache import read_csv_cached, bad_date_count
+from metrics import span, count
 
-def analyze_sales(csv_file='sales_data.csv'):
+# date_format: strftime format of the 'date' column, detected from the data when not given
+def analyze_sales(csv_file='sales_data.csv', date_format=None):
     try:
-        df = pd.read_csv(csv_file)
+        # typed Parquet copy of the CSV, re-parsed only when the CSV changes
+        with span('sales.read'):
+            df = read_csv_cached(csv_file, columns=['customer', 'amount', 'date'],
+                                 numeric_columns=('amount',), date_format=date_format)
     except FileNotFoundError:
         print(f"❌ File '{csv_file}' not found.")
         return None
 
-    # Ensure date column is in datetime format
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    # dates are already parsed; unreadable ones are NaT and were counted when the CSV was parsed
+    bad_dates = bad_date_count(df, 'date')
+    if bad_dates:
+        print(f"⚠️ {bad_dates} rows with an unreadable date were skipped")
     df = df.dropna(subset=['date'])
+    count('sales_rows', len(df))
+    count('sales_bad_dates', bad_dates)
 
-    # Total revenue
-    total_revenue = df['amount'].sum()
+    with span('sales.aggregate'):
+        # Total revenue
+        total_revenue = df['amount'].sum()
 
-    # Monthly revenue trend
-    df['month'] = df['date'].dt.to_period('M')
-    monthly_trend = df.groupby('month')['amount'].sum().reset_index()
+        # Monthly revenue trend
+        df['month'] = df['date'].dt.to_period('M')
+        monthly_trend = df.groupby('month')['amount'].sum().reset_index()
 
-    # Top 5 customers
-    top_customers = df.groupby('customer')['amount'].sum().nlargest(5).reset_index()
+        # Top 5 customers
+        top_customers = df.groupby('customer')['amount'].sum().nlargest(5).reset_index()
 
     # Output results
     print(f"✅ Total Revenue: ₹{total_revenue:,.2f}\n")
@@ -35,7 +45,7 @@ def analyze_sales(csv_file='sales_data.csv'):
     print("\n🏆 Top 5 Customers:")
     print(top_customers.to_string(index=False))
 
-    return total_revenue, monthly_trend, top_customers
+    return total_revenue, monthly_trend, top_customers, df
 
 if __name__ == "__main__":
     analyze_sales()
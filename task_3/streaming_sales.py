@@ -0,0 +1,176 @@
+#  Single-pass version of analyze_sales() for files too large to load (or piped on stdin).
+#    The CSV is read `chunksize` rows at a time; memory does not grow with the file
+#    Total revenue and the monthly trend are exact (one running sum per month)
+#    Revenue per customer is exact while there are at most `max_customers` distinct
+#    customers; past that, a Space-Saving summary of `max_customers` counters keeps the
+#    biggest customers, with a bound on how much each amount can be overstated (refunds
+#    are then totalled separately, see CustomerTotals)
+#  Usage: python streaming_sales.py [sales_data.csv | -] [--top 5] [--max-customers 100000]
+
+import argparse
+import heapq
+import sys
+import pandas as pd
+from date_parsing import detect_date_format, parse_dates
+from metrics import span, count
+
+# Space-Saving (Metwally et al.): `capacity` counters for weighted, non-negative updates.
+# A customer without a counter takes over the smallest one and inherits its amount as
+# `error`, so every estimate is between the true amount and true amount + error, and no
+# error is larger than total / capacity. Any customer whose true amount is above that
+# bound is guaranteed to have a counter.
+class SpaceSaving:
+    def __init__(self, capacity, counts=None):
+        self.capacity = capacity
+        self.counts = dict(counts or {})
+        self.errors = dict.fromkeys(self.counts, 0.0)
+        self.total = sum(self.counts.values())
+        self._rebuild_heap()
+
+    # min-heap of (count, key); entries whose count is out of date are skipped when popped
+    def _rebuild_heap(self):
+        self.heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self.heap)
+
+    def _pop_smallest(self):
+        while True:
+            count, key = heapq.heappop(self.heap)
+            if self.counts.get(key) == count:
+                return count, key
+
+    def add(self, key, weight):
+        self.total += weight
+        if key in self.counts:
+            self.counts[key] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = weight
+            self.errors[key] = 0.0
+        else:
+            smallest, evicted = self._pop_smallest()
+            del self.counts[evicted], self.errors[evicted]
+            self.counts[key] = smallest + weight
+            self.errors[key] = smallest
+        heapq.heappush(self.heap, (self.counts[key], key))
+        if len(self.heap) > 4 * self.capacity:
+            self._rebuild_heap()
+
+    # the largest possible overstatement of any estimate (the smallest counter)
+    def max_error(self):
+        return min(self.counts.values(), default=0.0)
+
+    # [(key, estimate, error)] for the n largest estimates
+    def top(self, n):
+        best = heapq.nlargest(n, self.counts.items(), key=lambda item: (item[1], item[0]))
+        return [(key, count, self.errors[key]) for key, count in best]
+
+# Exact revenue per customer in a dict until there are more than `max_customers` of them,
+# then a SpaceSaving summary seeded with the `max_customers` biggest ones: every customer
+# left out has at most the smallest amount kept, so the Space-Saving bounds still hold.
+# Space-Saving only allows counters to grow (a refund taken off a counter could drop it
+# below the error it vouches for), so from the switch on refunds go to `negative` instead,
+# and so do customers whose amount is negative at the switch. The estimates are then
+# revenue before those refunds.
+class CustomerTotals:
+    def __init__(self, max_customers):
+        self.max_customers = max_customers
+        self.exact = {}
+        self.sketch = None
+        self.negative = 0.0   # refunds left out of the per-customer amounts (sketch mode only)
+
+    def add(self, amounts):
+        if self.sketch is None:
+            for customer, amount in amounts.items():
+                self.exact[customer] = self.exact.get(customer, 0.0) + amount
+            if len(self.exact) > self.max_customers:
+                positive = {customer: amount for customer, amount in self.exact.items() if amount > 0}
+                self.negative = sum(amount for amount in self.exact.values() if amount < 0)
+                kept = heapq.nlargest(self.max_customers, positive.items(), key=lambda item: item[1])
+                self.sketch = SpaceSaving(self.max_customers, kept)
+                self.sketch.total = sum(positive.values())
+                self.exact = None
+            return
+        for customer, amount in amounts.items():
+            if amount >= 0:
+                self.sketch.add(customer, amount)
+            else:
+                self.negative += amount
+
+    # DataFrame customer, amount (and max_overcount once the summary is in use)
+    def top(self, n):
+        if self.sketch is None:
+            best = sorted(self.exact.items(), key=lambda item: (-item[1], item[0]))[:n]
+            return pd.DataFrame(best, columns=['customer', 'amount'])
+        return pd.DataFrame(self.sketch.top(n), columns=['customer', 'amount', 'max_overcount'])
+
+# Streams `csv_file` ('-' for stdin) and returns (total revenue, monthly trend, top customers,
+# None), the same results as analyze_sales() without the raw rows. Rows with an unreadable
+# date are skipped like there. The date format is detected from the first chunk and then
+# used for the whole file.
+def analyze_sales_streaming(csv_file='sales_data.csv', date_format=None, top_n=5, max_customers=100_000,
+                            chunksize=200_000):
+    source = sys.stdin if csv_file == '-' else csv_file
+    try:
+        reader = pd.read_csv(source, usecols=['customer', 'amount', 'date'], chunksize=chunksize,
+                             dtype={'customer': str, 'date': str})
+    except FileNotFoundError:
+        print(f"❌ File '{csv_file}' not found.")
+        return None
+
+    total_revenue = 0.0
+    monthly = {}
+    customers = CustomerTotals(max_customers)
+    rows = bad_dates = 0
+    with reader:
+        while True:
+            with span('sales.read'):
+                chunk = next(reader, None)
+                if chunk is None:
+                    break
+                rows += len(chunk)
+                date_format = date_format or detect_date_format(chunk['date'])
+                chunk['date'], bad = parse_dates(chunk['date'], date_format)
+                bad_dates += bad
+                chunk = chunk.dropna(subset=['date'])
+                chunk['amount'] = pd.to_numeric(chunk['amount'], errors='coerce')
+
+            with span('sales.aggregate'):
+                total_revenue += chunk['amount'].sum()
+                for month, amount in chunk.groupby(chunk['date'].dt.to_period('M'))['amount'].sum().items():
+                    monthly[month] = monthly.get(month, 0.0) + amount
+                customers.add(chunk.groupby('customer')['amount'].sum())
+    count('sales_rows', rows - bad_dates)
+    count('sales_bad_dates', bad_dates)
+
+    if bad_dates:
+        print(f"⚠️ {bad_dates} rows with an unreadable date were skipped")
+    monthly_trend = pd.DataFrame(sorted(monthly.items()), columns=['month', 'amount'])
+    top_customers = customers.top(top_n)
+
+    print(f"✅ Total Revenue: ₹{total_revenue:,.2f} ({rows:,} rows)\n")
+
+    print("📈 Monthly Revenue Trend:")
+    print(monthly_trend.to_string(index=False))
+
+    print(f"\n🏆 Top {top_n} Customers:")
+    print(top_customers.to_string(index=False))
+    if customers.sketch is not None:
+        print(f"⚠️ More than {max_customers:,} customers: amounts are estimates, each at most "
+              f"₹{customers.sketch.max_error():,.2f} too high (see max_overcount)")
+        if customers.negative:
+            print(f"⚠️ ₹{-customers.negative:,.2f} of refunds are not taken off the customer amounts")
+
+    return total_revenue, monthly_trend, top_customers, None
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-pass sales analyzer")
+    parser.add_argument('input', nargs='?', default='sales_data.csv', help="CSV file, or - for stdin")
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--max-customers', type=int, default=100_000,
+                        help="customers tracked exactly before switching to estimates")
+    parser.add_argument('--chunksize', type=int, default=200_000)
+    parser.add_argument('--date-format', help="strftime format of the date column (detected when omitted)")
+    args = parser.parse_args()
+    analyze_sales_streaming(args.input, args.date_format, args.top, args.max_customers, args.chunksize)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#  Tests for the per-customer totals of streaming_sales.py (run with: python -m pytest task_3)
+
+import random
+from streaming_sales import SpaceSaving, CustomerTotals
+
+# estimate - error <= true <= estimate for every counter, no error above the reported bound,
+# and every customer bigger than the bound has a counter
+def assert_space_saving_bounds(sketch, true_amounts):
+    bound = sketch.max_error()
+    for customer, estimate in sketch.counts.items():
+        assert sketch.errors[customer] <= bound + 1e-9
+        assert estimate - sketch.errors[customer] - 1e-9 <= true_amounts.get(customer, 0.0) <= estimate + 1e-9
+    for customer, amount in true_amounts.items():
+        if amount > bound + 1e-9:
+            assert customer in sketch.counts
+
+def test_space_saving_bounds():
+    rng = random.Random(1)
+    sketch, true_amounts = SpaceSaving(20), {}
+    for _ in range(5000):
+        customer = f"c{int(rng.paretovariate(1.2)) % 300}"
+        amount = rng.uniform(1, 100)
+        sketch.add(customer, amount)
+        true_amounts[customer] = true_amounts.get(customer, 0.0) + amount
+    assert_space_saving_bounds(sketch, true_amounts)
+    assert sketch.max_error() <= sketch.total / sketch.capacity + 1e-9
+
+def test_exact_until_max_customers():
+    totals = CustomerTotals(3)
+    totals.add({'a': 10.0, 'b': 4.0})
+    totals.add({'a': -3.0, 'c': 5.0})
+    assert totals.sketch is None
+    assert totals.top(2).to_dict('records') == [{'customer': 'a', 'amount': 7.0},
+                                                {'customer': 'c', 'amount': 5.0}]
+
+def test_switches_to_sketch_keeping_biggest():
+    totals = CustomerTotals(2)
+    totals.add({'a': 10.0, 'b': 8.0, 'x': 1.0, 'y': -2.0})
+    assert totals.exact is None
+    assert set(totals.sketch.counts) == {'a', 'b'}
+    assert totals.negative == -2.0
+    assert list(totals.top(2).columns) == ['customer', 'amount', 'max_overcount']
+
+def test_refund_keeps_error_bound():
+    totals = CustomerTotals(2)
+    totals.add({'a': 10.0, 'b': 10.0, 'x': 1.0})
+    totals.add({'c': 5.0})
+    totals.add({'b': -9.0})
+    # c took over a counter of 10, so its estimate of 15 may be 10 too high
+    assert totals.sketch.counts['c'] == 15.0
+    assert totals.sketch.max_error() >= 10.0
+    assert totals.negative == -9.0
+
+def test_bounds_hold_with_refunds():
+    rng = random.Random(7)
+    totals = CustomerTotals(10)
+    first = {f"c{i}": rng.uniform(1, 100) for i in range(15)}
+    totals.add(first)
+    sales, refunds = dict(first), 0.0
+    for _ in range(2000):
+        customer = f"c{int(rng.paretovariate(1.1)) % 80}"
+        amount = rng.uniform(1, 100) if rng.random() > 0.2 else -rng.uniform(1, 50)
+        totals.add({customer: amount})
+        if amount >= 0:
+            sales[customer] = sales.get(customer, 0.0) + amount
+        else:
+            refunds += amount
+    assert_space_saving_bounds(totals.sketch, sales)
+    assert abs(totals.negative - refunds) < 1e-6
@@ -1,25 +1,69 @@
 # 2.Use Matplotlib to visualize sales trends (bar chart & line graph)
+#   Charts are cached by their data (artifact_cache.py), so unchanged sales are not redrawn.
 
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.ticker import MaxNLocator
+from artifact_cache import input_digest, cached_artifact
 
-def plot_monthly_trend(monthly_df):
-    plt.figure(figsize=(10, 5))
-    plt.plot(monthly_df['month'].astype(str), monthly_df['amount'], marker='o')
-    plt.title('Monthly Revenue Trend')
-    plt.xlabel('Month')
-    plt.ylabel('Revenue')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig('monthly_trend.png')
-    plt.close()
+RENDERER_VERSION = 1
+MAX_CHART_POINTS = 500  # longer series are downsampled before plotting
 
-def plot_top_customers(top_df):
-    plt.figure(figsize=(8, 5))
-    plt.bar(top_df['customer'], top_df['amount'], color='skyblue')
-    plt.title('Top 5 Customers by Revenue')
-    plt.xlabel('Customer')
-    plt.ylabel('Revenue')
-    plt.tight_layout()
-    plt.savefig('top_customers.png')
-    plt.close()
+# Positions of at most `max_points` values that keep the shape of a line
+# (largest-triangle-three-buckets): the first and last points, then from each bucket the
+# point with the largest triangle between the previous kept point and the next bucket's mean.
+def downsample_positions(values, max_points=MAX_CHART_POINTS):
+    values = np.nan_to_num(np.asarray(values, dtype=float))
+    n = len(values)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    keep = [0]
+    for b in range(max_points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            next_x, next_y = (hi + edges[b + 2] - 1) / 2, values[hi:edges[b + 2]].mean()
+        else:
+            next_x, next_y = n - 1, values[-1]
+        a = keep[-1]
+        x = np.arange(lo, hi)
+        area = np.abs((a - next_x) * (values[lo:hi] - values[a]) - (a - x) * (next_y - values[a]))
+        keep.append(lo + int(area.argmax()))
+    keep.append(n - 1)
+    return np.array(keep)
 
+def plot_monthly_trend(monthly_df, output_file='monthly_trend.png', cache=True):
+    def render(path):
+        keep = downsample_positions(monthly_df['amount'])
+        downsampled = len(keep) < len(monthly_df)
+        plt.figure(figsize=(10, 5))
+        plt.plot(monthly_df['month'].astype(str).to_numpy()[keep], monthly_df['amount'].to_numpy()[keep],
+                 marker=None if downsampled else 'o')
+        plt.title('Monthly Revenue Trend')
+        plt.xlabel('Month')
+        plt.ylabel('Revenue')
+        if downsampled:
+            plt.gca().xaxis.set_major_locator(MaxNLocator(12))
+        plt.xticks(rotation=45)
+        plt.tight_layout()
+        plt.savefig(path)
+        plt.close()
+
+    key = input_digest('monthly_trend', RENDERER_VERSION, MAX_CHART_POINTS, monthly_df[['month', 'amount']])
+    if cached_artifact(output_file, key, render, enabled=cache):
+        print(f"♻️ '{output_file}' is up to date (sales unchanged)")
+
+def plot_top_customers(top_df, output_file='top_customers.png', cache=True):
+    def render(path):
+        plt.figure(figsize=(8, 5))
+        plt.bar(top_df['customer'], top_df['amount'], color='skyblue')
+        plt.title('Top 5 Customers by Revenue')
+        plt.xlabel('Customer')
+        plt.ylabel('Revenue')
+        plt.tight_layout()
+        plt.savefig(path)
+        plt.close()
+
+    key = input_digest('top_customers', RENDERER_VERSION, top_df[['customer', 'amount']])
+    if cached_artifact(output_file, key, render, enabled=cache):
+        print(f"♻️ '{output_file}' is up to date (sales unchanged)")
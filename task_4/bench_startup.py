@@ -0,0 +1,81 @@
+#  Startup guard for the CRM CLI.
+#    1. `python -X importtime -c "import crm_lite_integrated"`: total import time, the
+#       slowest imports, and a check that no heavy library is loaded at startup
+#    2. time to first prompt: runs the CLI in a scratch folder and waits for "Choice:"
+#  Exits with status 1 when the median time to the prompt is over --budget-ms or a
+#  heavy module was imported, so it can run as a check after changes.
+#  Usage: python bench_startup.py [--runs 5] [--budget-ms 500] [--top 8]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(HERE, 'crm_lite_integrated.py')
+# must only be imported by the menu actions that use them
+HEAVY_MODULES = ('pandas', 'numpy', 'matplotlib', 'fpdf', 'pywhatkit', 'openpyxl', 'xlsxwriter', 'pyarrow')
+
+# returns [(module, self_us, cumulative_us, depth)] parsed from -X importtime output
+def import_times():
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import crm_lite_integrated'],
+                         capture_output=True, text=True, cwd=HERE, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+# seconds from starting the CLI until the menu asks for a choice
+def time_to_prompt(workdir):
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-u', APP], cwd=workdir, stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    seen = b''
+    while b'Choice:' not in seen:
+        chunk = proc.stdout.read1(4096)
+        if not chunk:
+            raise RuntimeError("CLI exited before showing the menu")
+        seen += chunk
+    elapsed = time.perf_counter() - start
+    proc.communicate(b'9\n', timeout=30)
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="CRM CLI startup benchmark")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=500)
+    parser.add_argument('--top', type=int, default=8, help="slowest imports to list")
+    args = parser.parse_args()
+
+    rows = import_times()
+    total = next(cum for name, _, cum, depth in rows if name == 'crm_lite_integrated' and depth == 0)
+    print(f"Import of crm_lite_integrated: {total / 1000:.1f} ms")
+    print(f"{'Module':<40}{'Self ms':>10}{'Cumulative ms':>15}")
+    direct = [r for r in rows if r[3] == 1]
+    for name, self_us, cum_us, _ in sorted(direct, key=lambda r: -r[2])[:args.top]:
+        print(f"{name:<40}{self_us / 1000:>10.1f}{cum_us / 1000:>15.1f}")
+
+    heavy = sorted({name.split('.')[0] for name, *_ in rows if name.split('.')[0] in HEAVY_MODULES})
+    if heavy:
+        print(f"❌ Heavy modules imported at startup: {', '.join(heavy)}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        times = [time_to_prompt(workdir) for _ in range(args.runs)]
+    median_ms = statistics.median(times) * 1000
+    print(f"Time to first prompt: median {median_ms:.0f} ms, "
+          f"min {min(times) * 1000:.0f} ms, max {max(times) * 1000:.0f} ms ({args.runs} runs)")
+
+    if heavy or median_ms > args.budget_ms:
+        print(f"❌ Startup check failed (budget {args.budget_ms:.0f} ms)")
+        sys.exit(1)
+    print(f"✅ Startup within budget ({args.budget_ms:.0f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -19,58 +19,313 @@ e. Send bulk emails to stored customers
 # Kogniti Minds CRM Lite - Unified CLI Main File
 
 import sqlite3
-import pandas as pd
-import matplotlib.pyplot as plt
-import smtplib
-from email.message import EmailMessage
-import pywhatkit as kit
 from datetime import datetime
-from fpdf import FPDF
 import time
 import os
-import re
+import importlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import sys
 
 DB_NAME = 'crm_lite.db'
 
-# -------- clean_leads.py integration --------
-def is_valid_email(email):
-    pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-    return bool(re.match(pattern, str(email)))
+# the task_1..task_3 folders: their modules are imported from there instead of being copied here
+TASKS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _task in ('task_1', 'task_2', 'task_3'):
+    sys.path.append(os.path.join(TASKS_DIR, _task))
+
+# pandas and the task_1..task_3 modules are imported the first time an attribute is used, so
+# the menu appears without loading them and only the actions that need them pay for it
+# (pywhatkit is imported inside the function that uses it).
+class LazyModule:
+    def __init__(self, name, on_import=None):
+        self._name = name
+        self._on_import = on_import
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            if self._on_import:
+                self._on_import()
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# charts are only saved to files; Agg needs no display and is safe in worker processes
+def _use_agg_backend():
+    import matplotlib
+    matplotlib.use('Agg')
+
+pd = LazyModule('pandas')
+email_validation = LazyModule('email_validation')  # task_1
+phone_validation = LazyModule('phone_validation')  # task_1
+lead_dedupe = LazyModule('lead_dedupe')            # task_1
+template_cache = LazyModule('template_cache')      # task_2
+smtp_pool = LazyModule('smtp_pool')                # task_2, pulls in smtplib / ssl
+artifact_cache = LazyModule('artifact_cache')      # task_3
+visualizer = LazyModule('visualizer', on_import=_use_agg_backend)  # task_3, pulls in matplotlib
+exporter = LazyModule('exporter')                  # task_3, pulls in fpdf
+
+# spans time whole stages and counters add up rows / messages (task_1/metrics.py); both do
+# nothing until metrics.enable() is called (--metrics)
+import metrics
+from metrics import span, count, record_span, profile
+
+# -------- Database access --------
+# smallest string above every string starting with `prefix` ('jo' -> 'jp')
+def _prefix_end(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+# One long-lived SQLite connection per thread (and per process: pool workers forked from
+# the CLI open their own), so actions don't pay connect + schema parsing every time and
+# sqlite3's per-connection prepared statement cache actually gets reused.
+class CRMRepository:
+    def __init__(self, db_name=DB_NAME):
+        self.db_name = db_name
+        self._local = threading.local()
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_name, cached_statements=256)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA cache_size=-20000')  # ~20 MB page cache
+            conn.execute('PRAGMA temp_store=MEMORY')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+    # ---- leads ----
+    # a lead whose mailbox (email_key) is already stored counts as a duplicate,
+    # like an exact email match does through the UNIQUE constraint
+    INSERT_LEAD = ('INSERT OR IGNORE INTO leads (name, email, email_key, phone, phone_valid, source) '
+                   'SELECT ?, ?, ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM leads WHERE email_key = ?)')
+
+    def add_lead(self, name, email, email_key, phone, source, phone_valid=False):
+        with self.conn:
+            cur = self.conn.execute(self.INSERT_LEAD, (name, email, email_key, phone, int(phone_valid), source, email_key))
+        if cur.rowcount == 0:
+            raise sqlite3.IntegrityError(f"lead with mailbox {email_key} already exists")
+
+    # rows are (name, email, email_key, phone, phone_valid, source); returns how many were actually inserted
+    def insert_leads_ignoring_duplicates(self, rows, batch_size=5000, on_progress=None):
+        conn = self.conn
+        before = conn.total_changes
+        with conn:
+            for start in range(0, len(rows), batch_size):
+                conn.executemany(self.INSERT_LEAD, (row + (row[2],) for row in rows[start:start + batch_size]))
+                if on_progress:
+                    on_progress(min(start + batch_size, len(rows)), len(rows))
+        return conn.total_changes - before
+
+    def get_lead_name(self, lead_id):
+        row = self.conn.execute('SELECT name FROM leads WHERE id = ?', (lead_id,)).fetchone()
+        return row[0] if row else None
+
+    def all_leads(self):
+        return self.conn.execute('SELECT id, name, email, phone, source, date_added FROM leads').fetchall()
+
+    # Keyset paging: `after` is the last row of the previous page (None for the first).
+    # A name filter pages in (name, id) order along idx_leads_name_id, an email filter in
+    # email order along the UNIQUE email index, otherwise by id; prefixes are index ranges,
+    # so a page costs `limit` index steps however many leads match. Only a source filter
+    # combined with a name or email prefix is checked row by row inside that range.
+    def leads_page(self, after=None, limit=20, name=None, email_prefix=None, source=None):
+        clauses, params = [], []
+        if name:
+            name = name.strip()
+            clauses.append('name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE')
+            params += [name, _prefix_end(name.lower())]
+        if email_prefix:
+            email_prefix = email_prefix.strip().lower()
+            clauses.append('email >= ? AND email < ?')
+            params += [email_prefix, _prefix_end(email_prefix)]
+        if source:
+            # '+' keeps SQLite on the prefix's index instead of idx_leads_source + a sort
+            clauses.append('+source = ?' if name or email_prefix else 'source = ?')
+            params.append(source)
+
+        if name:
+            order = 'name COLLATE NOCASE, id'
+            if after:
+                clauses.append('(name COLLATE NOCASE, id) > (?, ?)')
+                params += [after[1], after[0]]
+        elif email_prefix:
+            order = 'email'
+            if after:
+                clauses.append('email > ?')
+                params.append(after[2])
+        else:
+            order = 'id'
+            if after:
+                clauses.append('id > ?')
+                params.append(after[0])
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ''
+        params.append(limit)
+        return self.conn.execute('SELECT id, name, email, phone, source, date_added FROM leads '
+                                 f"{where}ORDER BY {order} LIMIT ?", params).fetchall()
+
+    def count_leads(self):
+        return self.conn.execute('SELECT COUNT(*) FROM leads').fetchone()[0]
+
+    def find_lead_by_email(self, email):
+        email_key = lead_dedupe.canonical_emails(pd.Series([email])).iloc[0]
+        return self.conn.execute('SELECT id, name FROM leads WHERE email_key = ?', (email_key,)).fetchone()
+
+    def lead_contacts(self, columns=('name', 'email')):
+        return pd.read_sql_query(f"SELECT {', '.join(columns)} FROM leads", self.conn)
+
+    # leads whose phone was normalized to E.164 at import; served by the partial index
+    # idx_leads_sendable, so invalid or missing phones are never read
+    def sendable_contacts(self):
+        return pd.read_sql_query('SELECT name, phone FROM leads WHERE phone_valid = 1 ORDER BY id', self.conn)
+
+    # ---- sales ----
+    def add_sale(self, lead_id, customer_name, amount, date):
+        with self.conn:
+            self.conn.execute('INSERT INTO sales (lead_id, customer_name, amount, date) VALUES (?, ?, ?, ?)',
+                              (lead_id, customer_name, amount, date))
+
+    # ---- WhatsApp outbox ----
+    # skips messages still queued or being sent to that phone, and with resume=True also
+    # ones already sent (an interrupted campaign run again); returns how many were queued
+    def enqueue_outbound_messages(self, rows, resume=False):
+        statuses = "'queued', 'sending', 'sent'" if resume else "'queued', 'sending'"
+        conn = self.conn
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            before = conn.total_changes
+            conn.executemany(f'''
+                INSERT INTO whatsapp_outbox (phone, name, message)
+                SELECT ?1, ?2, ?3 WHERE NOT EXISTS (
+                    SELECT 1 FROM whatsapp_outbox WHERE phone = ?1 AND message = ?3 AND status IN ({statuses}))
+            ''', rows)
+            return conn.total_changes - before
 
+    # atomically takes the oldest queued message: (id, phone, message, attempts) or None
+    def claim_outbound_message(self):
+        conn = self.conn
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute("SELECT id, phone, message, attempts FROM whatsapp_outbox "
+                               "WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row:
+                conn.execute("UPDATE whatsapp_outbox SET status = 'sending', attempts = attempts + 1 WHERE id = ?",
+                             (row[0],))
+        return row
+
+    def finish_outbound_message(self, message_id, status, error=None):
+        with self.conn:
+            self.conn.execute("UPDATE whatsapp_outbox SET status = ?, last_error = ?, "
+                              "sent_at = CASE WHEN ? = 'sent' THEN CURRENT_TIMESTAMP END WHERE id = ?",
+                              (status, None if error is None else str(error), status, message_id))
+
+    def outbound_status_counts(self):
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM whatsapp_outbox GROUP BY status').fetchall())
+
+    # bumped by triggers on every change to `sales` (see init_sales_version)
+    def sales_version(self):
+        return self.conn.execute('SELECT version FROM sales_totals WHERE id = 1').fetchone()[0]
+
+    def sales(self, start_date=None, end_date=None):
+        where, params = sales_date_filter(start_date, end_date)
+        return pd.read_sql_query(f'SELECT customer_name, amount, date FROM sales{where}', self.conn, params=params)
+
+repo = CRMRepository()
+
+# -------- clean_leads.py integration --------
+# Emails and phones are checked column-wise by task_1/email_validation.py and
+# task_1/phone_validation.py. leads.email_key holds lead_dedupe.canonical_emails(email)
+# (task_1/lead_dedupe.py), so Gmail dot / +tag variants of an existing lead are skipped on insert.
 def import_clean_leads():
     filename = input("CSV filename (default company_leads.csv): ").strip() or "company_leads.csv"
     if not os.path.exists(filename):
         print(f"❌ File '{filename}' not found")
         return
-    df = pd.read_csv(filename)
+    batch_size = input("Batch size (default 5000): ").strip()
+    batch_size = int(batch_size) if batch_size.isdigit() and int(batch_size) > 0 else 5000
+    country_code = input("Country code for phones without one, e.g. 91 (default none): ").strip() or None
+    # the duplicate search scans every stored lead, so it is only run when asked for
+    merge_report = input("Save possible duplicates for review to (e.g. merge_candidates.csv, blank to skip): ").strip()
+    import_leads_file(filename, batch_size, country_code, merge_report or None)
+
+# the import behind menu option 3 without the prompts (also used by benchmarks/);
+# merge_report: CSV file for write_merge_report(), None skips it
+def import_leads_file(filename, batch_size=5000, country_code=None, merge_report=None, show_progress=True):
+    with span('import.read'):
+        df = pd.read_csv(filename, dtype=str)
     df.columns = df.columns.str.strip().str.lower()
     if "email" not in df.columns or "name" not in df.columns:
         print("Missing required columns")
         return
-    df['valid_email'] = df['email'].apply(is_valid_email)
-    df = df[df['valid_email']].drop_duplicates(subset='email')
-    conn = sqlite3.connect(DB_NAME)
-    imported, skipped = 0, 0
-    for _, row in df.iterrows():
-        try:
-            conn.execute('INSERT INTO leads (name, email, phone, source) VALUES (?, ?, ?, ?)', (
-                row['name'], row['email'].lower(), str(row.get('phone')), row.get('source', 'CSV')))
-            imported += 1
-        except sqlite3.IntegrityError:
-            skipped += 1
-    conn.commit()
-    conn.close()
+    count('leads_read', len(df))
+    with span('import.validate'):
+        checked = email_validation.validate_emails(df['email'])
+        df['email'] = checked['email']
+        df = df[checked['valid']]
+    count('leads_invalid_email', len(checked) - len(df))
+    with span('import.dedupe'):
+        valid = len(df)
+        df = df[~lead_dedupe.canonical_emails(df['email']).duplicated()].copy()
+    count('leads_duplicate', valid - len(df))
+    if 'phone' in df.columns:
+        with span('import.phones'):
+            phones = phone_validation.normalize_phones(df['phone'], country_code)
+            df['phone'], df['phone_valid'] = phones['phone'], phones['valid']
+        invalid_phones = int((~phones['valid'] & df['phone'].notna()).sum())
+        count('leads_invalid_phone', invalid_phones)
+        print(f"Invalid phones (stored but not used for WhatsApp): {invalid_phones}")
+    with span('import.db_write'):
+        imported, skipped = bulk_insert_leads(df, batch_size=batch_size, show_progress=show_progress)
+    count('leads_imported', imported)
+    count('leads_already_stored', skipped)
     print(f"Imported: {imported}, Duplicates skipped: {skipped}")
+    if merge_report:
+        write_merge_report(merge_report)
+    return imported, skipped
 
-# -------- mailer.py integration --------
-def load_template(template_file):
-    with open(template_file, 'r') as f:
-        return f.read()
+# likely duplicates across all stored leads (typos, same person with two mailboxes),
+# written for manual review; row_a / row_b are lead ids
+def write_merge_report(output_file='merge_candidates.csv'):
+    leads = pd.read_sql_query('SELECT id, name, email FROM leads', repo.conn, index_col='id')
+    with span('import.merge_candidates'):
+        candidates = lead_dedupe.find_merge_candidates(leads)
+    count('merge_candidates', len(candidates))
+    candidates.rename(columns={'row_a': 'lead_id_a', 'row_b': 'lead_id_b'}).to_csv(output_file, index=False)
+    print(f"Possible duplicates for review: {len(candidates)} (saved to {output_file})")
+
+# inserts a cleaned leads DataFrame with INSERT OR IGNORE + executemany inside one
+# transaction; returns exact (imported, skipped) counts from conn.total_changes
+def bulk_insert_leads(df, batch_size=5000, show_progress=True):
+    def column(name, default=None):
+        if name not in df.columns:
+            return [default] * len(df)
+        return df[name].astype(object).where(df[name].notna(), None).tolist()
 
+    def progress(done, total):
+        print(f"\rImporting... {done}/{total} ({done * 100 // total}%)", end='', flush=True)
+
+    phones = [None if p is None else str(p) for p in column('phone')]
+    phone_valid = [int(bool(v)) for v in column('phone_valid', False)]
+    email_keys = lead_dedupe.canonical_emails(df['email']).tolist()
+    rows = list(zip(column('name'), column('email'), email_keys, phones, phone_valid, column('source', 'CSV')))
+    imported = repo.insert_leads_ignoring_duplicates(rows, batch_size, progress if show_progress else None)
+    if show_progress and rows:
+        print()
+    return imported, len(rows) - imported
+
+# -------- mailer.py integration --------
+# templates are parsed and rendered by task_2/template_cache.py and sent through the
+# pooled sender in task_2/smtp_pool.py (one SMTP connection per worker thread, a shared
+# messages-per-second token bucket, reconnect + retry with backoff per message)
 def send_bulk_emails():
-    conn = sqlite3.connect(DB_NAME)
-    leads = conn.execute('SELECT name, email FROM leads').fetchall()
-    conn.close()
+    leads = repo.lead_contacts(('name', 'email'))
     sender = input("Sender email: ")
     password = input("App password: ")
     print("Template: 1=welcome.txt, 2=thank_you.txt")
@@ -79,137 +334,320 @@ def send_bulk_emails():
     if not os.path.exists(template_file):
         print("Template missing")
         return
-    template = load_template(template_file)
-    subject = input("Email subject: ")
-    try:
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(sender, password)
-        for name, email in leads:
-            msg = EmailMessage()
-            msg['Subject'] = subject
-            msg['From'] = sender
-            msg['To'] = email
-            msg.set_content(template.replace("{name}", name))
-            server.send_message(msg)
-            print(f"Sent: {name} ({email})")
-        server.quit()
-    except Exception as e:
-        print("Email error:", e)
+    template = template_cache.load_compiled_template(template_file)
+    subject = input(f"Email subject (default '{template.subject}'): ").strip() or template.subject
+    workers = input("SMTP connections (default 4): ").strip()
+    rate = input("Max emails per second (default 10): ").strip()
+    pool = smtp_pool.SMTPPool('smtp.gmail.com', 587, sender, password,
+                    workers=int(workers) if workers.isdigit() and int(workers) > 0 else 4,
+                    rate=float(rate) if rate.replace('.', '', 1).isdigit() and float(rate) > 0 else 10)
+
+    messages = template_cache.build_email_messages(template, leads, sender, subject)
+    keyed = (((name, email_address), msg) for name, (email_address, msg) in zip(leads['name'].tolist(), messages))
+
+    print_lock = threading.Lock()
+    def on_result(lead, msg, error):
+        with print_lock:
+            if error is None:
+                print(f"Sent: {lead[0]} ({lead[1]})")
+            else:
+                print(f"Email error for {lead[1]}: {error}")
+
+    stats = pool.send_all(keyed, on_result=on_result)
+    print(f"Sent: {stats['sent']}, Failed: {stats['failed']}, {stats['throughput']:.1f} emails/s")
+    if stats['aborted']:
+        print(f"Stopped early, SMTP login failed: {stats['aborted']}")
 
 # -------- whatsapp_sender.py integration --------
-def send_whatsapp_messages():
-    conn = sqlite3.connect(DB_NAME)
-    df = pd.read_sql_query('SELECT name, phone FROM leads', conn)
-    conn.close()
+# Outbound WhatsApp queue (see task_2/whatsapp_queue.py): messages are stored in the
+# whatsapp_outbox table and a background thread sends them, so the menu returns at once.
+class PyWhatKitTransport:
+    min_interval = 2.0
+    max_interval = 60.0
+
+    def send(self, phone, message):
+        import pywhatkit as kit  # imported on first use, it starts browser tooling
+        kit.sendwhatmsg_instantly(phone_no=phone, message=message, wait_time=10, tab_close=True, close_time=3)
+
+# Sends queued messages until the queue is empty or stop() is called. The gap between
+# messages starts at the transport's min_interval, doubles after a failure (up to
+# max_interval) and shrinks by a quarter after each success.
+class WhatsAppDispatcher(threading.Thread):
+    def __init__(self, transport, max_attempts=3):
+        super().__init__(name='whatsapp-dispatch', daemon=True)
+        self.transport = transport
+        self.max_attempts = max_attempts
+        self.interval = transport.min_interval
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    # runs a repository call, waiting out 'database is locked' (another writer holding the
+    # database past sqlite's timeout) with growing pauses, so the thread doesn't die with
+    # its message stuck in 'sending'. Returns None once stop() was called.
+    def _retry_locked(self, func, *args):
+        delay = 0.5
+        while True:
+            try:
+                return func(*args)
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                count('whatsapp_db_busy')
+                if self._stop_event.wait(delay):
+                    return None
+                delay = min(delay * 2, 30.0)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            item = self._retry_locked(repo.claim_outbound_message)
+            if item is None:
+                break
+            message_id, phone, message, attempts = item
+            try:
+                self.transport.send(phone, message)
+                error = None
+            except Exception as e:
+                error = e
+            if error is None:
+                self._retry_locked(repo.finish_outbound_message, message_id, 'sent')
+                count('whatsapp_sent')
+                self.interval = max(self.transport.min_interval, self.interval * 0.75)
+            else:
+                retry = attempts + 1 < self.max_attempts
+                self._retry_locked(repo.finish_outbound_message, message_id, 'queued' if retry else 'failed', error)
+                count('whatsapp_retries' if retry else 'whatsapp_failed')
+                self.interval = min(self.transport.max_interval, max(self.interval * 2, 1.0))
+            if self.interval:
+                self._stop_event.wait(self.interval)
+        repo.close()
+
+_whatsapp_dispatcher = None
+
+def start_whatsapp_dispatcher(transport=None):
+    global _whatsapp_dispatcher
+    if _whatsapp_dispatcher is None or not _whatsapp_dispatcher.is_alive():
+        _whatsapp_dispatcher = WhatsAppDispatcher(transport or PyWhatKitTransport())
+        _whatsapp_dispatcher.start()
+    return _whatsapp_dispatcher
+
+def stop_whatsapp_dispatcher():
+    if _whatsapp_dispatcher is not None and _whatsapp_dispatcher.is_alive():
+        _whatsapp_dispatcher.stop()
+        _whatsapp_dispatcher.join()
+
+def send_whatsapp_messages(transport=None, resume=None):
+    df = repo.sendable_contacts()
     template_file = "welcome.txt"
     if not os.path.exists(template_file): print("Template missing"); return
-    template = load_template(template_file)
-    for _, row in df.iterrows():
-        phone = str(row['phone'])
-        name = row['name']
-        if not phone or not phone.startswith('+'):
-            print(f"Skipping phone: {phone}")
-            continue
-        try:
-            print(f"Sending WhatsApp to {name} ({phone})...")
-            kit.sendwhatmsg_instantly(phone_no=phone, message=template.format(name=name), wait_time=10, tab_close=True)
-            time.sleep(15)
-        except Exception as e:
-            print(f"WhatsApp fail for {phone}: {e}")
+    if resume is None:
+        resume = input("Resume previous campaign and skip already sent? (y/N): ").strip().lower() == 'y'
+    template = template_cache.load_compiled_template(template_file)
+    with span('whatsapp.render'):
+        messages = template.render_bodies(df, {'name': 'Customer'})
+        rows = list(zip(df['phone'].tolist(), df['name'].tolist(), list(messages)))
+    with span('whatsapp.enqueue'):
+        queued = repo.enqueue_outbound_messages(rows, resume)
+    count('whatsapp_queued', queued)
+    if queued < len(rows):
+        print(f"Skipped {len(rows) - queued} messages already queued" + (" or sent" if resume else ""))
+    start_whatsapp_dispatcher(transport)
+    print(f"Queued {queued} WhatsApp messages, sending in background. Status: {repo.outbound_status_counts()}")
 
 # -------- Sales + Analytics + Reporting (sales_analyzer.py, visualizer.py, exporter.py) --------
 def record_sales_data():
-    list_leads()
-    lead_id = input("Lead ID: ").strip()
+    lead = input("Lead ID or email (blank to browse leads): ").strip()
+    if not lead:
+        list_leads()
+        lead = input("Lead ID: ").strip()
     amount = input("Sale Amount: ").strip()
     try:
-        conn = sqlite3.connect(DB_NAME)
-        name = conn.execute('SELECT name FROM leads WHERE id=?', (lead_id,)).fetchone()
+        if '@' in lead:
+            found = repo.find_lead_by_email(lead)
+            lead_id, name = found if found else (None, None)
+        else:
+            lead_id, name = lead, repo.get_lead_name(lead)
         if not name:
-            print("Invalid Lead ID")
-            conn.close()
+            print("Invalid Lead ID" if lead_id else "No lead with that email")
             return
-        conn.execute('INSERT INTO sales (lead_id, customer_name, amount, date) VALUES (?, ?, ?, ?)', (
-            lead_id, name[0], float(amount), datetime.now().strftime('%Y-%m-%d')))
-        conn.commit()
-        conn.close()
-        print(f"Recorded sale for {name[0]}: ₹{amount}")
+        repo.add_sale(lead_id, name, float(amount), datetime.now().strftime('%Y-%m-%d'))
+        print(f"Recorded sale for {name}: ₹{amount}")
     except Exception as e:
         print("Error:", e)
 
-def analyze_sales():
-    conn = sqlite3.connect(DB_NAME)
-    df = pd.read_sql_query('SELECT customer_name, amount, date FROM sales', conn)
-    conn.close()
-    if df.empty:
-        print("No sales")
-        return None, None, None, df
-    df['date'] = pd.to_datetime(df['date'])
-    df['month'] = df['date'].dt.to_period('M')
-    total = df['amount'].sum()
-    monthly = df.groupby('month')['amount'].sum().reset_index()
-    top = df.groupby('customer_name')['amount'].sum().nlargest(5).reset_index()
+# WHERE clause + parameters for an optional inclusive 'YYYY-MM-DD' date range on sales.date
+def sales_date_filter(start_date=None, end_date=None):
+    clauses, params = [], []
+    if start_date:
+        clauses.append('date >= ?')
+        params.append(start_date)
+    if end_date:
+        clauses.append('date <= ?')
+        params.append(end_date)
+    return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+# Analytics query layer. Without a date range the rollup tables kept by the sales triggers
+# are read (see init_sales_rollups); with a range the grouping runs inside SQLite over the
+# idx_sales_date covering index, so only the requested slice of `sales` is touched.
+def query_total_revenue(conn, start_date=None, end_date=None):
+    if not start_date and not end_date:
+        return conn.execute('SELECT amount, sale_count FROM sales_totals WHERE id = 1').fetchone()
+    where, params = sales_date_filter(start_date, end_date)
+    return conn.execute(f'SELECT COALESCE(SUM(amount), 0), COUNT(*) FROM sales{where}', params).fetchone()
+
+def query_monthly_trend(conn, start_date=None, end_date=None):
+    if not start_date and not end_date:
+        return pd.read_sql_query('SELECT month, amount FROM sales_monthly WHERE sale_count > 0 ORDER BY month', conn)
+    where, params = sales_date_filter(start_date, end_date)
+    return pd.read_sql_query(f"SELECT strftime('%Y-%m', date) AS month, SUM(amount) AS amount FROM sales{where} "
+                             "GROUP BY month ORDER BY month", conn, params=params)
+
+def query_top_customers(conn, top_n=5, start_date=None, end_date=None):
+    if not start_date and not end_date:
+        return pd.read_sql_query('SELECT customer_name, amount FROM sales_by_customer ORDER BY amount DESC LIMIT ?',
+                                 conn, params=[top_n])
+    where, params = sales_date_filter(start_date, end_date)
+    return pd.read_sql_query(f'SELECT customer_name, SUM(amount) AS amount FROM sales{where} '
+                             'GROUP BY customer_name ORDER BY amount DESC LIMIT ?', conn, params=params + [top_n])
+
+def analyze_sales(start_date=None, end_date=None, top_n=5):
+    with span('sales.aggregate'):
+        total, sales_count = query_total_revenue(repo.conn, start_date, end_date)
+        if not sales_count:
+            print("No sales")
+            return None, None, None, None
+        monthly = query_monthly_trend(repo.conn, start_date, end_date)
+        top = query_top_customers(repo.conn, top_n, start_date, end_date)
+    count('sales_rows', sales_count)
     print(f"Revenue: ₹{total}")
     print("Trend:\n", monthly)
     print("Top Customers:\n", top)
-    return total, monthly, top, df
+    return total, monthly, top, None
 
+def load_all_sales(start_date=None, end_date=None):
+    return repo.sales(start_date, end_date)
+
+# asks for an optional date range; blank answers mean "all sales"
+def ask_date_range():
+    dates = []
+    for label in ("Start date", "End date"):
+        value = input(f"{label} (YYYY-MM-DD, blank for all): ").strip()
+        try:
+            dates.append(datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d') if value else None)
+        except ValueError:
+            print(f"Invalid date '{value}', ignoring")
+            dates.append(None)
+    return dates[0], dates[1]
+
+# -- report stages: charts by task_3/visualizer.py, workbook and PDF by task_3/exporter.py --
+# generate_report() does the caching itself (see below), so the stages always render
 def plot_monthly_trend(monthly):
-    plt.figure(figsize=(8,4))
-    plt.plot(monthly['month'].astype(str), monthly['amount'], marker='o')
-    plt.title('Monthly Revenue')
-    plt.savefig('monthly_trend.png')
-    plt.close()
-    print("Saved plot: monthly_trend.png")
+    visualizer.plot_monthly_trend(monthly, 'monthly_trend.png', cache=False)
 
 def plot_top_customers(top):
-    plt.figure(figsize=(6,4))
-    plt.bar(top['customer_name'], top['amount'], color='sky blue')
-    plt.title('Top 5 Customers')
-    plt.savefig('top_customers.png')
-    plt.close()
-    print("Saved plot: top_customers.png")
-
-def export_to_pdf(total, monthly, top):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200,10,txt="Sales Report",ln=True,align='C')
-    pdf.cell(200,10,txt=f"Total Revenue: ₹{total:,.2f}",ln=True)
-    pdf.cell(200,10,txt="Monthly Revenue",ln=True)
-    for _, r in monthly.iterrows():
-        pdf.cell(200,10,txt=f"{r['month']}: ₹{r['amount']:,.2f}",ln=True)
-    pdf.cell(200,10,txt="Top Customers",ln=True)
-    for _, r in top.iterrows():
-        pdf.cell(200,10,txt=f"{r['customer_name']}: ₹{r['amount']:,.2f}",ln=True)
-    pdf.output('sales_report.pdf')
-    print("PDF saved: sales_report.pdf")
-
-def export_to_excel(monthly, top, df):
-    with pd.ExcelWriter('sales_report.xlsx') as writer:
-        monthly.to_excel(writer, sheet_name='MonthlyTrend', index=False)
-        top.to_excel(writer, sheet_name='TopCustomers', index=False)
-        df.to_excel(writer, sheet_name='AllSales', index=False)
-    print("Excel saved: sales_report.xlsx")
-
-def generate_report():
-    total, monthly, top, df = analyze_sales()
-    if monthly is not None: plot_monthly_trend(monthly)
-    if top is not None: plot_top_customers(top)
-    export_to_excel(monthly, top, df)
-    export_to_pdf(total, monthly, top)
+    visualizer.plot_top_customers(top, 'top_customers.png', cache=False)
+
+def export_to_pdf(total, monthly, top, top_n=5):
+    exporter.export_to_pdf(total, monthly, top, 'sales_report.pdf', top_n=top_n, cache=False)
+
+# runs one report stage inside a pool worker and returns (stage name, seconds, error).
+# Errors come back as text because some library exceptions can't be pickled back
+# to the parent and would break the whole pool.
+def run_report_stage(name, func, *args):
+    start = time.perf_counter()
+    try:
+        func(*args)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return name, time.perf_counter() - start, error
+
+# the Excel stage loads AllSales itself so the raw rows are never pickled to a worker
+def export_excel_stage(monthly, top, start_date, end_date):
+    exporter.export_to_excel(monthly, top, load_all_sales(start_date, end_date), 'sales_report.xlsx', cache=False)
+
+# worker processes are reused between reports instead of being started for each one
+_report_pool = None
+
+def get_report_pool(workers):
+    global _report_pool
+    if _report_pool is None:
+        _report_pool = ProcessPoolExecutor(max_workers=workers)
+    return _report_pool
+
+# aggregates are computed once, then charts, Excel and PDF are produced in parallel
+# processes (pyplot is not thread-safe), so the report takes about as long as its
+# slowest stage instead of the sum of all stages. The PDF embeds the charts, so it
+# starts once both chart stages are done.
+# Every file is keyed by the data it shows (task_3/artifact_cache.py) and copied from
+# .report_cache instead of being rendered again when that data hasn't changed. The
+# workbook holds every sale in the range, so its key uses the sales version counter.
+# Stage times measured in the workers are recorded as 'render.<file name>' spans.
+def generate_report(start_date=None, end_date=None, workers=4, top_n=5):
+    started = time.perf_counter()
+    total, monthly, top, _ = analyze_sales(start_date, end_date, top_n)
+    if total is None:
+        return
+    top = top.rename(columns={'customer_name': 'customer'})  # the column name task_3's renderers use
+    timings = [('aggregate', time.perf_counter() - started, None)]
+    digest = artifact_cache.input_digest
+    keys = {'monthly_trend.png': digest('monthly chart', visualizer.RENDERER_VERSION, visualizer.MAX_CHART_POINTS,
+                                        monthly),
+            'top_customers.png': digest('top customers chart', visualizer.RENDERER_VERSION, top),
+            'sales_report.xlsx': digest('excel', exporter.RENDERER_VERSION, start_date, end_date, monthly, top,
+                                        repo.sales_version())}
+
+    # None when the file came from the cache, otherwise the submitted stage
+    def submit(name, output_file, func, *args):
+        if artifact_cache.restore_artifact(output_file, keys[output_file]):
+            timings.append((name, 0.0, 'cached'))
+            count('artifact_cache_hits')
+            return None
+        count('artifact_cache_misses')
+        return get_report_pool(workers).submit(run_report_stage, name, func, *args), output_file
+
+    def finish(stage):
+        if stage is None:
+            return
+        future, output_file = stage
+        name, seconds, error = future.result()
+        timings.append((name, seconds, error))
+        record_span(f"render.{output_file}", seconds)
+        if error is None:
+            artifact_cache.store_artifact(output_file, keys[output_file])
+
+    charts = [submit('monthly chart', 'monthly_trend.png', plot_monthly_trend, monthly),
+              submit('top customers chart', 'top_customers.png', plot_top_customers, top)]
+    excel = submit('excel', 'sales_report.xlsx', export_excel_stage, monthly, top, start_date, end_date)
+    for stage in charts:
+        finish(stage)
+    # keyed by the chart files it embeds, so a PDF built while a chart was missing or
+    # stale is not reused once the chart is right
+    keys['sales_report.pdf'] = digest('pdf', exporter.RENDERER_VERSION, total, top_n, monthly, top,
+                                      [artifact_cache.file_digest(chart) for chart in ('monthly_trend.png', 'top_customers.png')])
+    pdf = submit('pdf', 'sales_report.pdf', export_to_pdf, total, monthly, top, top_n)
+    finish(excel)
+    finish(pdf)
+    for name, seconds, error in timings:
+        if error == 'cached':
+            print(f"  {name:<20}{'cached':>9}")
+            continue
+        print(f"  {name:<20}{seconds:>8.2f}s" + (f"  FAILED ({error})" if error else ""))
+    print(f"Report finished in {time.perf_counter() - started:.2f}s")
 
 # -------- Basic DB/CLI --------
 def init_database():
-    conn = sqlite3.connect(DB_NAME)
+    conn = repo.conn
     c = conn.cursor()
     c.execute('''
         CREATE TABLE IF NOT EXISTS leads (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
             email TEXT NOT NULL UNIQUE,
+            email_key TEXT,
             phone TEXT,
+            phone_valid INTEGER NOT NULL DEFAULT 0,
             source TEXT,
             date_added TEXT DEFAULT CURRENT_TIMESTAMP
         )
@@ -224,8 +662,150 @@ def init_database():
             FOREIGN KEY (lead_id) REFERENCES leads (id)
         )
     ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_sales_date ON sales (date, customer_name, amount)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_sales_lead_id ON sales (lead_id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_sales_customer ON sales (customer_name, amount)')
+    # (name, id) order for list_leads' name search (replaces the name-only index)
+    c.execute('DROP INDEX IF EXISTS idx_leads_name')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_leads_name_id ON leads (name COLLATE NOCASE, id)')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS whatsapp_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            phone TEXT NOT NULL,
+            name TEXT,
+            message TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            sent_at TEXT
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_whatsapp_outbox_status ON whatsapp_outbox (status, id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_whatsapp_outbox_phone ON whatsapp_outbox (phone)')
+    # messages interrupted by the previous run go back to the queue
+    c.execute("UPDATE whatsapp_outbox SET status = 'queued' WHERE status = 'sending'")
+    c.execute('CREATE INDEX IF NOT EXISTS idx_leads_source ON leads (source, id)')
+    init_phone_validation(c)
+    init_email_keys(c)
+    init_sales_rollups(c)
+    init_sales_version(c)
     conn.commit()
-    conn.close()
+
+# Databases created before phones were normalized get the phone_valid column and have
+# their existing phones normalized once. Only leads with phone_valid = 1 are in the
+# partial index behind repo.sendable_contacts().
+def init_phone_validation(c):
+    columns = [row[1] for row in c.execute('PRAGMA table_info(leads)')]
+    if 'phone_valid' not in columns:
+        c.execute('ALTER TABLE leads ADD COLUMN phone_valid INTEGER NOT NULL DEFAULT 0')
+        c.execute("UPDATE leads SET phone = NULL WHERE phone IN ('', 'nan', 'None')")  # left by older imports
+        leads = pd.read_sql_query('SELECT id, phone FROM leads WHERE phone IS NOT NULL', c.connection)
+        phones = phone_validation.normalize_phones(leads['phone'])
+        c.executemany('UPDATE leads SET phone = ?, phone_valid = ? WHERE id = ?',
+                      zip(phones['phone'].tolist(), phones['valid'].astype(int).tolist(), leads['id'].tolist()))
+    c.execute('CREATE INDEX IF NOT EXISTS idx_leads_sendable ON leads (id, name, phone) WHERE phone_valid = 1')
+
+# Fills leads.email_key for databases created before mailbox keys existed
+def init_email_keys(c):
+    columns = [row[1] for row in c.execute('PRAGMA table_info(leads)')]
+    if 'email_key' not in columns:
+        c.execute('ALTER TABLE leads ADD COLUMN email_key TEXT')
+        leads = pd.read_sql_query('SELECT id, email FROM leads', c.connection)
+        c.executemany('UPDATE leads SET email_key = ? WHERE id = ?',
+                      zip(lead_dedupe.canonical_emails(leads['email']).tolist(), leads['id'].tolist()))
+    c.execute('CREATE INDEX IF NOT EXISTS idx_leads_email_key ON leads (email_key)')
+
+# Rollup tables for analytics, maintained by triggers on every insert/update/delete in
+# `sales`, so record_sales_data() and any bulk loader keep them current automatically:
+#   sales_monthly      revenue and sale count per 'YYYY-MM'
+#   sales_by_customer  revenue and sale count per customer
+#   sales_totals       single row with the running total
+def init_sales_rollups(c):
+    existed = c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='sales_totals'").fetchone()
+    c.executescript('''
+        CREATE TABLE IF NOT EXISTS sales_monthly (
+            month TEXT PRIMARY KEY,
+            amount REAL NOT NULL DEFAULT 0,
+            sale_count INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS sales_by_customer (
+            customer_name TEXT PRIMARY KEY,
+            amount REAL NOT NULL DEFAULT 0,
+            sale_count INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_sales_by_customer_amount ON sales_by_customer (amount DESC);
+        CREATE TABLE IF NOT EXISTS sales_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            amount REAL NOT NULL DEFAULT 0,
+            sale_count INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO sales_totals (id, amount, sale_count) VALUES (1, 0, 0);
+
+        CREATE TRIGGER IF NOT EXISTS sales_rollup_insert AFTER INSERT ON sales BEGIN
+            INSERT INTO sales_monthly (month, amount, sale_count) VALUES (substr(NEW.date, 1, 7), NEW.amount, 1)
+                ON CONFLICT (month) DO UPDATE SET amount = amount + excluded.amount, sale_count = sale_count + 1;
+            INSERT INTO sales_by_customer (customer_name, amount, sale_count) VALUES (NEW.customer_name, NEW.amount, 1)
+                ON CONFLICT (customer_name) DO UPDATE SET amount = amount + excluded.amount, sale_count = sale_count + 1;
+            UPDATE sales_totals SET amount = amount + NEW.amount, sale_count = sale_count + 1 WHERE id = 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS sales_rollup_delete AFTER DELETE ON sales BEGIN
+            UPDATE sales_monthly SET amount = amount - OLD.amount, sale_count = sale_count - 1
+                WHERE month = substr(OLD.date, 1, 7);
+            UPDATE sales_by_customer SET amount = amount - OLD.amount, sale_count = sale_count - 1
+                WHERE customer_name = OLD.customer_name;
+            DELETE FROM sales_by_customer WHERE customer_name = OLD.customer_name AND sale_count <= 0;
+            UPDATE sales_totals SET amount = amount - OLD.amount, sale_count = sale_count - 1 WHERE id = 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS sales_rollup_update AFTER UPDATE OF amount, date, customer_name ON sales BEGIN
+            UPDATE sales_monthly SET amount = amount - OLD.amount, sale_count = sale_count - 1
+                WHERE month = substr(OLD.date, 1, 7);
+            UPDATE sales_by_customer SET amount = amount - OLD.amount, sale_count = sale_count - 1
+                WHERE customer_name = OLD.customer_name;
+            DELETE FROM sales_by_customer WHERE customer_name = OLD.customer_name AND sale_count <= 0;
+            INSERT INTO sales_monthly (month, amount, sale_count) VALUES (substr(NEW.date, 1, 7), NEW.amount, 1)
+                ON CONFLICT (month) DO UPDATE SET amount = amount + excluded.amount, sale_count = sale_count + 1;
+            INSERT INTO sales_by_customer (customer_name, amount, sale_count) VALUES (NEW.customer_name, NEW.amount, 1)
+                ON CONFLICT (customer_name) DO UPDATE SET amount = amount + excluded.amount, sale_count = sale_count + 1;
+            UPDATE sales_totals SET amount = amount - OLD.amount + NEW.amount WHERE id = 1;
+        END;
+    ''')
+    if not existed:
+        rebuild_sales_rollups(c)
+
+# sales_totals.version changes with every insert/update/delete in `sales`, so cached report
+# files that contain raw sales know when they are out of date
+def init_sales_version(c):
+    columns = [row[1] for row in c.execute('PRAGMA table_info(sales_totals)')]
+    if 'version' not in columns:
+        c.execute('ALTER TABLE sales_totals ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+    c.executescript('''
+        CREATE TRIGGER IF NOT EXISTS sales_version_insert AFTER INSERT ON sales BEGIN
+            UPDATE sales_totals SET version = version + 1 WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS sales_version_delete AFTER DELETE ON sales BEGIN
+            UPDATE sales_totals SET version = version + 1 WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS sales_version_update AFTER UPDATE ON sales BEGIN
+            UPDATE sales_totals SET version = version + 1 WHERE id = 1;
+        END;
+    ''')
+
+# one-off full recomputation, used when the rollups are added to an existing database
+def rebuild_sales_rollups(c):
+    c.executescript('''
+        DELETE FROM sales_monthly;
+        DELETE FROM sales_by_customer;
+        INSERT INTO sales_monthly (month, amount, sale_count)
+            SELECT substr(date, 1, 7), SUM(amount), COUNT(*) FROM sales GROUP BY substr(date, 1, 7);
+        INSERT INTO sales_by_customer (customer_name, amount, sale_count)
+            SELECT customer_name, SUM(amount), COUNT(*) FROM sales GROUP BY customer_name;
+        UPDATE sales_totals SET amount = (SELECT COALESCE(SUM(amount), 0) FROM sales),
+                                sale_count = (SELECT COUNT(*) FROM sales) WHERE id = 1;
+    ''')
+
 
 def add_new_lead():
     name = input("Name: ")
@@ -233,29 +813,51 @@ def add_new_lead():
     phone = input("Phone with +countrycode: ")
     source = input("Source: ")
     if not name or not email: print("Name and Email required"); return
-    if not is_valid_email(email): print("Invalid Email"); return
+    if not email_validation.is_valid_email(email): print("Invalid Email"); return
+    checked = phone_validation.normalize_phones(pd.Series([phone]))
+    if phone.strip() and not checked['valid'].iloc[0]: print("Invalid Phone, use +countrycode"); return
+    phone = checked['phone'].iloc[0] if phone.strip() else None
     try:
-        conn = sqlite3.connect(DB_NAME)
-        conn.execute('INSERT INTO leads (name, email, phone, source) VALUES (?, ?, ?, ?)', (name, email, phone, source))
-        conn.commit()
-        conn.close()
+        email_key = lead_dedupe.canonical_emails(pd.Series([email])).iloc[0]
+        repo.add_lead(name, email, email_key, phone, source, phone_valid=phone is not None)
         print(f"Lead '{name}' added.")
     except sqlite3.IntegrityError:
         print("Duplicate email.")
     except Exception as e:
         print("Error:", e)
 
-def list_leads():
-    conn = sqlite3.connect(DB_NAME)
-    leads = conn.execute('SELECT id, name, email, phone, source, date_added FROM leads').fetchall()
-    conn.close()
+def print_leads(leads):
     print(f"{'ID':<4}{'Name':<18}{'Email':<24}{'Phone':<15}{'Source':<13}{'Date'}")
     print("-"*88)
     for l in leads:
-        print(f"{l[0]:<4}{l[1]:<18}{l[2]:<24}{l[3]:<15}{l[4]:<13}{l[5][:10]}")
-    print(f"Total leads: {len(leads)}")
+        print(f"{l[0]:<4}{l[1]:<18}{l[2]:<24}{l[3] or '':<15}{l[4] or '':<13}{l[5][:10]}")
+
+# pages through leads page_size at a time; 's' sets a name/email/source filter
+def list_leads(page_size=20):
+    print(f"Total leads: {repo.count_leads()}")
+    filters = {}
+    after = None
+    while True:
+        leads = repo.leads_page(after, page_size, **filters)
+        print_leads(leads)
+        if len(leads) < page_size:
+            print("-- end of list --")
+        cmd = input("[Enter] next page, s = search, q = back: ").strip().lower()
+        if cmd == 'q' or (cmd == '' and len(leads) < page_size):
+            break
+        if cmd == 's':
+            filters = {
+                'name': input("Name starts with (blank = any): ").strip() or None,
+                'email_prefix': input("Email starts with (blank = any): ").strip() or None,
+                'source': input("Source (blank = any): ").strip() or None,
+            }
+            after = None
+        elif leads:
+            after = leads[-1]
 
-def main_menu():
+# profile_actions: run each chosen action under profile() (--profile)
+def main_menu(profile_actions=False):
+    call = profile if profile_actions else lambda func, *a, **kw: func(*a, **kw)
     init_database()
     while True:
         print("\n== KOGNITI MINDS CRM LITE ==")
@@ -263,14 +865,27 @@ def main_menu():
         ch = input("Choice: ").strip()
         if ch == "1": add_new_lead()
         elif ch == "2": list_leads()
-        elif ch == "3": import_clean_leads()
+        elif ch == "3": call(import_clean_leads)
         elif ch == "4": record_sales_data()
-        elif ch == "5": analyze_sales()
-        elif ch == "6": generate_report()
-        elif ch == "7": send_bulk_emails()
-        elif ch == "8": send_whatsapp_messages()
-        elif ch == "9": print("Bye!"); break
+        elif ch == "5": call(analyze_sales, *ask_date_range())
+        elif ch == "6": call(generate_report, *ask_date_range())
+        elif ch == "7": call(send_bulk_emails)
+        elif ch == "8": call(send_whatsapp_messages)
+        elif ch == "9":
+            stop_whatsapp_dispatcher()
+            print("Bye!"); repo.close(); break
         else: print("Invalid choice")
 
 if __name__ == "__main__":
-    main_menu()
+    import argparse
+    parser = argparse.ArgumentParser(description="Kogniti Minds CRM Lite")
+    parser.add_argument('--metrics', type=str,
+                        help="Record stage timings and counters to this file on exit (.prom: Prometheus text, else JSON lines)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Run each import, analytics, report and messaging action under cProfile and tracemalloc")
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+    main_menu(profile_actions=args.profile)
+    if args.metrics:
+        metrics.write_metrics(args.metrics, run='task_4')